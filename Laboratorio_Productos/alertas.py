@@ -0,0 +1,110 @@
+""" Alertas de vencimiento y de stock bajo.
+
+MonitorAlertas.revisar() devuelve solo las alertas nuevas desde la revision anterior:
+- vencimiento: productos alimenticios que vencen dentro de dias_vencimiento dias.
+- stock_bajo: productos con stock menor a stock_minimo (se vuelve a avisar si en una revision
+  el stock ya estaba repuesto y despues baja otra vez).
+
+Ninguna revision recorre el catalogo. La primera lee con consultas por indice (Stock y
+fecha_vencimiento) los productos en alerta y los vencimientos de los proximos dias en un
+monticulo (heapq) ordenado por fecha. Las siguientes leen solo el registro de cambios
+(GestionProductos.seguir_cambios), que cubre las escrituras de cualquier proceso, y actualizan
+el monticulo y el conjunto de stock bajo con los productos modificados. Cada
+HORIZONTE_DIAS dias se agregan al monticulo los vencimientos del tramo siguiente.
+ """
+
+import heapq
+import threading
+from datetime import date, timedelta
+
+from modelos import parsear_fecha
+
+class MonitorAlertas:
+    # Ademas de la ventana de aviso se cargan HORIZONTE_DIAS dias mas de vencimientos, asi la
+    # consulta por rango de fechas se repite una vez cada HORIZONTE_DIAS dias y no en cada revision
+    HORIZONTE_DIAS = 30
+
+    def __init__(self, gestion, dias_vencimiento=None, stock_minimo=None):
+        self.gestion = gestion
+        if dias_vencimiento is None or stock_minimo is None:
+            from decouple import config
+            if dias_vencimiento is None:
+                dias_vencimiento = config('ALERTA_DIAS_VENCIMIENTO', default=7, cast=int)
+            if stock_minimo is None:
+                stock_minimo = config('ALERTA_STOCK_MINIMO', default=5, cast=int)
+        self.dias_vencimiento = dias_vencimiento
+        self.stock_minimo = stock_minimo
+        self.vencimientos = []  # monticulo de (fecha_vencimiento, Nombre)
+        self.fechas = {}        # Nombre -> fecha_vencimiento vigente, para los productos hasta limite
+        self.stock_bajo = set() # Nombres con stock bajo ya informados
+        self.limite = None      # fecha hasta la que se cargaron los vencimientos
+        self.cambios = None     # SeguimientoCambios desde la primera revision
+        self.__lock = threading.Lock()
+
+    def _seguir_vencimiento(self, nombre, fecha):
+        if fecha is None or fecha > self.limite:
+            # sin vencimiento o fuera del horizonte: si habia una entrada en el monticulo
+            # queda desactualizada y se descarta al salir
+            self.fechas.pop(nombre, None)
+        elif self.fechas.get(nombre) != fecha:
+            self.fechas[nombre] = fecha
+            heapq.heappush(self.vencimientos, (fecha, nombre))
+
+    def _revisar_stock(self, producto, alertas):
+        nombre = producto['Nombre']
+        if producto['Stock'] >= self.stock_minimo:
+            self.stock_bajo.discard(nombre)
+        elif nombre not in self.stock_bajo:
+            self.stock_bajo.add(nombre)
+            alertas.append({'tipo': 'stock_bajo', 'Nombre': nombre, 'Stock': producto['Stock']})
+
+    def _aplicar_cambios(self, alertas):
+        # los cambios traen el estado actual del producto: repetidos o tardios no cambian el resultado
+        for cambio in self.cambios.nuevos():
+            producto = cambio['producto']
+            if producto is None:
+                self.fechas.pop(cambio['Nombre'], None)
+                self.stock_bajo.discard(cambio['Nombre'])
+            else:
+                fecha = producto['fecha_vencimiento']
+                self._seguir_vencimiento(producto['Nombre'], parsear_fecha(fecha) if fecha else None)
+                self._revisar_stock(producto, alertas)
+
+    def _extender_horizonte(self, hoy):
+        desde = self.limite
+        self.limite = hoy + timedelta(days=self.dias_vencimiento + self.HORIZONTE_DIAS)
+        for producto in self.gestion.leer_productos_por_vencer(desde, self.limite):
+            self._seguir_vencimiento(producto['Nombre'], parsear_fecha(producto['fecha_vencimiento']))
+
+    def revisar(self, hoy=None):
+        hoy = hoy or date.today()
+        alertas = []
+        with self.__lock:
+            if self.cambios is None:
+                # la version se toma antes de leer, para no perder cambios hechos durante la carga
+                version = self.gestion.version_cambios()
+                if version is None:
+                    return alertas
+                self.cambios = self.gestion.seguir_cambios(version)
+                self.limite = hoy - timedelta(days=1)
+                for producto in self.gestion.leer_productos_stock_bajo(self.stock_minimo):
+                    self._revisar_stock(producto, alertas)
+            else:
+                self._aplicar_cambios(alertas)
+
+            aviso = hoy + timedelta(days=self.dias_vencimiento)
+            extendido = aviso > self.limite
+            if extendido:
+                self._extender_horizonte(hoy)
+
+            avisados = set()
+            while self.vencimientos and self.vencimientos[0][0] <= aviso:
+                fecha, nombre = heapq.heappop(self.vencimientos)
+                if self.fechas.get(nombre) == fecha and nombre not in avisados:
+                    avisados.add(nombre)
+                    alertas.append({'tipo': 'vencimiento', 'Nombre': nombre, 'fecha_vencimiento': fecha,
+                                    'dias': (fecha - hoy).days})
+            if extendido:
+                # los vencidos ya salieron del monticulo: se dejan de seguir
+                self.fechas = {nombre: fecha for nombre, fecha in self.fechas.items() if fecha >= hoy}
+        return alertas
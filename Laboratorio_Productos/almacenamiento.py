@@ -0,0 +1,343 @@
+""" Motores de almacenamiento de GestionProductos.
+
+Cada backend sabe abrir y devolver conexiones, crear el esquema y resolver las pocas
+operaciones que dependen del dialecto SQL. El resto de las consultas de GestionProductos
+se escriben una sola vez con marcadores %s.
+
+- BackendMySQL: mysql.connector con pool de conexiones.
+- BackendSQLite: base embebida (modo WAL), pensada para tiendas locales y pruebas rapidas.
+
+crear_replicas arma los backends de las replicas de lectura (DB_REPLICAS): 'host:puerto' en
+MySQL (mismas credenciales y base que el primario) o rutas de archivo en SQLite, que se abren
+en modo solo lectura.
+
+mysql.connector y la configuracion (.env) se cargan en la primera conexion, no al importar.
+ """
+
+import threading
+import time
+from datetime import date
+
+from esquema import crear_esquema
+
+MOTORES = ('mysql', 'sqlite')
+
+def _mysql():
+    # importar mysql.connector cuesta decenas de ms: solo se hace al usarlo
+    import mysql.connector
+    import mysql.connector.pooling
+    return mysql.connector
+
+def _sqlite():
+    import sqlite3
+    return sqlite3
+
+class _ErrorDelDriver:
+    # Backend.Error / IntegrityError: la clase del driver se resuelve al usarla
+    def __init__(self, driver, nombre):
+        self.driver = driver
+        self.nombre = nombre
+
+    def __get__(self, instancia, clase):
+        return getattr(self.driver(), self.nombre)
+
+class BackendMySQL:
+    motor = 'mysql'
+    Error = _ErrorDelDriver(_mysql, 'Error')
+    IntegrityError = _ErrorDelDriver(_mysql, 'IntegrityError')
+    # Las versiones del registro de cambios se asignan al escribir y no al confirmar: los
+    # consumidores releen este margen de versiones (ver clases.SeguimientoCambios)
+    margen_cambios = 1000
+
+    def __init__(self, usar_pool=None, host=None, port=None):
+        # Lo que no se pasa aca se lee de la configuracion en la primera conexion
+        self.host = host
+        self.database = None
+        self.user = None
+        self.password = None
+        self.port = port
+        self.usar_pool = usar_pool
+        self.pool_size = None
+        self.pool_timeout = None
+        self.__configurado = False
+        self.__pool = None
+        self.__lock_pool = threading.Lock()
+
+    def _configurar(self):
+        from decouple import config
+
+        self.host = self.host or config('DB_HOST')
+        self.database = self.database or config('DB_NAME')
+        self.user = self.user or config('DB_USER')
+        self.password = self.password or config('DB_PASSWORD')
+        self.port = self.port or config('DB_PORT')
+
+        # Pool de conexiones (mysql.connector admite hasta 32 conexiones por pool)
+        if self.usar_pool is None:
+            self.usar_pool = config('DB_POOL', default=True, cast=bool)
+        self.pool_size = self.pool_size or config('DB_POOL_SIZE', default=5, cast=int)
+        self.pool_timeout = self.pool_timeout or config('DB_POOL_TIMEOUT', default=10, cast=float)
+        self.__configurado = True
+
+    @staticmethod
+    def _opciones_cliente():
+        # FOUND_ROWS: rowcount cuenta las filas que cumplen el WHERE y no solo las modificadas,
+        # asi un UPDATE que deja el mismo valor (ajuste de 0) no se confunde con un producto inexistente
+        return [_mysql().constants.ClientFlag.FOUND_ROWS]
+
+    def _crear_pool(self):
+        return _mysql().pooling.MySQLConnectionPool(
+            pool_name=f"productos_{id(self)}",
+            pool_size=self.pool_size,
+            pool_reset_session=True,
+            host=self.host,
+            database= self.database,
+            user=self.user,
+            password=self.password,
+            port=self.port,
+            client_flags=self._opciones_cliente()
+        )
+
+    def _conexion_del_pool(self):
+        if self.__pool is None:
+            # dos hilos que piden la primera conexion a la vez no deben crear dos pools
+            with self.__lock_pool:
+                if self.__pool is None:
+                    self.__pool = self._crear_pool()
+
+        # get_connection falla en el acto si el pool esta agotado, se reintenta hasta el timeout.
+        # El pool reconecta por su cuenta las conexiones que is_connected() detecta caidas.
+        limite = time.monotonic() + self.pool_timeout
+        while True:
+            try:
+                return self.__pool.get_connection()
+            except _mysql().errors.PoolError:
+                if time.monotonic() >= limite:
+                    raise _mysql().errors.PoolError(f"No hay conexiones libres en el pool tras {self.pool_timeout} segundos")
+                time.sleep(0.01)
+
+    def connect(self):
+        if not self.__configurado:
+            self._configurar()
+        if self.usar_pool:
+            connection = self._conexion_del_pool()
+        else:
+            connection = _mysql().connect(
+                host=self.host,
+                database= self.database,
+                user=self.user,
+                password=self.password,
+                port=self.port,
+                client_flags=self._opciones_cliente()
+            )
+
+        if connection.is_connected():
+            return connection
+        connection.close()
+        return None
+
+    def crear_esquema(self, connection, esquema):
+        crear_esquema(connection, esquema, self.motor)
+
+    # Suma cantidad al stock sin dejarlo negativo; LAST_INSERT_ID(expr) devuelve el nuevo valor
+    # en la misma consulta. Devuelve None si el producto no existe o el stock no alcanza.
+    def ajustar_stock(self, cursor, nombre_producto, cantidad):
+        cursor.execute(
+            'UPDATE productos SET stock = LAST_INSERT_ID(stock + %s) WHERE nombre = %s AND stock + %s >= 0',
+            (cantidad, nombre_producto, cantidad)
+        )
+        if cursor.rowcount == 0:
+            return None
+        return cursor.lastrowid or 0
+
+    def ajustar_precio(self, cursor, nombre_producto, porcentaje):
+        cursor.execute(
+            'UPDATE productos SET precio = precio * (1 + %s / 100) WHERE nombre = %s AND precio * (1 + %s / 100) > 0',
+            (porcentaje, nombre_producto, porcentaje)
+        )
+        if cursor.rowcount == 0:
+            return None
+        # la fila ya esta bloqueada por el UPDATE: se lee el valor escrito en la misma transaccion
+        cursor.execute('SELECT precio FROM productos WHERE nombre = %s FOR UPDATE', (nombre_producto,))
+        return float(cursor.fetchone()[0])
+
+    # Años completos entre columna y hoy, como fragmento SQL con sus parametros
+    def anios_desde(self, columna, hoy):
+        return f"TIMESTAMPDIFF(YEAR, {columna}, %s)", (hoy,)
+
+class _CursorSQLite:
+    # Adapta el cursor de sqlite3 a la interfaz de mysql.connector que usa GestionProductos:
+    # context manager, marcadores %s y filas como dict con dictionary=True.
+    __consultas = {}
+
+    def __init__(self, cursor, dictionary=False):
+        self.__cursor = cursor
+        if dictionary:
+            self.__cursor.row_factory = lambda cur, fila: {col[0]: valor for col, valor in zip(cur.description, fila)}
+
+    @classmethod
+    def _traducir(cls, query):
+        traducida = cls.__consultas.get(query)
+        if traducida is None:
+            traducida = cls.__consultas[query] = query.replace('%s', '?')
+        return traducida
+
+    def execute(self, query, parametros=()):
+        self.__cursor.execute(self._traducir(query), parametros)
+
+    def executemany(self, query, filas):
+        self.__cursor.executemany(self._traducir(query), filas)
+
+    def fetchone(self):
+        return self.__cursor.fetchone()
+
+    def fetchall(self):
+        return self.__cursor.fetchall()
+
+    def fetchmany(self, cantidad):
+        return self.__cursor.fetchmany(cantidad)
+
+    @property
+    def rowcount(self):
+        return self.__cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self.__cursor.lastrowid
+
+    def close(self):
+        self.__cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class _ConexionSQLite:
+    def __init__(self, connection):
+        self.__connection = connection
+
+    def cursor(self, dictionary=False):
+        return _CursorSQLite(self.__connection.cursor(), dictionary)
+
+    def commit(self):
+        self.__connection.commit()
+
+    def rollback(self):
+        self.__connection.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        # La conexion queda abierta para reutilizarla en el mismo hilo; solo se descarta
+        # una transaccion pendiente, como hace el pool de MySQL al devolver la conexion.
+        if self.__connection.in_transaction:
+            self.__connection.rollback()
+
+def _registrar_fechas_sqlite(sqlite3):
+    sqlite3.register_adapter(date, date.isoformat)
+    sqlite3.register_converter('DATE', lambda valor: date.fromisoformat(valor.decode()))
+
+class BackendSQLite:
+    motor = 'sqlite'
+    Error = _ErrorDelDriver(_sqlite, 'Error')
+    IntegrityError = _ErrorDelDriver(_sqlite, 'IntegrityError')
+    # Un solo escritor a la vez: las versiones se confirman en orden
+    margen_cambios = 0
+
+    PRAGMAS = (
+        'PRAGMA journal_mode = WAL',
+        'PRAGMA synchronous = NORMAL',
+        'PRAGMA foreign_keys = ON',
+        'PRAGMA temp_store = MEMORY',
+        'PRAGMA cache_size = -65536',
+        'PRAGMA mmap_size = 268435456',
+        'PRAGMA busy_timeout = 5000',
+    )
+
+    def __init__(self, ruta=None, solo_lectura=False):
+        # sin ruta se usa DB_SQLITE_RUTA, leida en la primera conexion
+        self.ruta = ruta
+        # solo_lectura (replicas): si el archivo no existe la conexion falla en lugar de crear una base vacia
+        self.solo_lectura = solo_lectura
+        # una conexion por hilo (sqlite3 no comparte conexiones entre hilos)
+        self.__local = threading.local()
+
+    def connect(self):
+        connection = getattr(self.__local, 'connection', None)
+        if connection is None:
+            if self.ruta is None:
+                from decouple import config
+                self.ruta = config('DB_SQLITE_RUTA', default='productos.db')
+            sqlite3 = _sqlite()
+            _registrar_fechas_sqlite(sqlite3)
+            if self.solo_lectura:
+                # pathlib cuesta ~10 ms de importacion: solo lo usan las replicas
+                import pathlib
+                connection = sqlite3.connect(
+                    f"{pathlib.Path(self.ruta).absolute().as_uri()}?mode=ro",
+                    detect_types=sqlite3.PARSE_DECLTYPES,
+                    cached_statements=512,
+                    uri=True
+                )
+            else:
+                connection = sqlite3.connect(
+                    self.ruta,
+                    detect_types=sqlite3.PARSE_DECLTYPES,
+                    cached_statements=512
+                )
+            for pragma in self.PRAGMAS:
+                # el modo del diario lo fija quien escribe la base
+                if not (self.solo_lectura and pragma.startswith('PRAGMA journal_mode')):
+                    connection.execute(pragma)
+            self.__local.connection = connection
+        return _ConexionSQLite(connection)
+
+    def crear_esquema(self, connection, esquema):
+        crear_esquema(connection, esquema, self.motor)
+
+    def ajustar_stock(self, cursor, nombre_producto, cantidad):
+        cursor.execute(
+            'UPDATE productos SET stock = stock + %s WHERE nombre = %s AND stock + %s >= 0 RETURNING stock',
+            (cantidad, nombre_producto, cantidad)
+        )
+        filas = cursor.fetchall()
+        return filas[0][0] if filas else None
+
+    def ajustar_precio(self, cursor, nombre_producto, porcentaje):
+        cursor.execute(
+            'UPDATE productos SET precio = precio * (1 + %s / 100.0) WHERE nombre = %s AND precio * (1 + %s / 100.0) > 0 RETURNING precio',
+            (porcentaje, nombre_producto, porcentaje)
+        )
+        filas = cursor.fetchall()
+        return float(filas[0][0]) if filas else None
+
+    def anios_desde(self, columna, hoy):
+        # diferencia de años, menos uno si en el año de hoy todavia no se llego al mes-dia de la fecha
+        return (f"(CAST(strftime('%Y', %s) AS INTEGER) - CAST(strftime('%Y', {columna}) AS INTEGER)"
+                f" - (strftime('%m-%d', %s) < strftime('%m-%d', {columna})))", (hoy, hoy))
+
+def crear_backend(motor=None, usar_pool=None, ruta=None):
+    if motor is None:
+        from decouple import config
+        motor = config('DB_MOTOR', default='mysql')
+    if motor == 'mysql':
+        return BackendMySQL(usar_pool=usar_pool)
+    if motor == 'sqlite':
+        return BackendSQLite(ruta=ruta)
+    raise ValueError(f"Motor de base de datos desconocido: {motor}. Opciones: {', '.join(MOTORES)}")
+
+def crear_replicas(motor, replicas, usar_pool=None):
+    # replicas: backends ya creados o endpoints ('host:puerto' en MySQL, ruta en SQLite)
+    backends = []
+    for replica in replicas:
+        if not isinstance(replica, str):
+            backends.append(replica)
+        elif motor == 'sqlite':
+            backends.append(BackendSQLite(ruta=replica, solo_lectura=True))
+        else:
+            host, _, port = replica.partition(':')
+            backends.append(BackendMySQL(usar_pool=usar_pool, host=host, port=port or None))
+    return backends
@@ -0,0 +1,125 @@
+""" Analisis del catalogo de productos.
+
+- AnalisisCatalogo: calcula sobre un ProductoBatch en memoria con NumPy (los arreglos del
+  batch se copian una vez con numpy.frombuffer, asi el batch puede seguir creciendo).
+- AnalisisSQL: resuelve las mismas preguntas con GROUP BY en la base, sin traer las filas.
+ """
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from esquema import SELECT_PRODUCTOS
+
+TIPO_SQL = """CASE WHEN t.fecha_vencimiento IS NOT NULL THEN 'alimenticio'
+                   WHEN t.fecha_fabricacion IS NOT NULL THEN 'electronico'
+                   ELSE 'producto' END"""
+
+class AnalisisCatalogo:
+    def __init__(self, batch):
+        self.batch = batch
+        self.precios = np.frombuffer(batch.precios, dtype=np.float64).copy()
+        self.stocks = np.frombuffer(batch.stocks, dtype=np.int64).copy()
+        self.tipos = np.frombuffer(batch.tipos, dtype=np.int8).copy()
+        self.fechas = np.frombuffer(batch.fechas, dtype=np.dtype(f'i{batch.fechas.itemsize}')).copy()
+        # codigos enteros por origen para agrupar con bincount
+        indices = {}
+        self.codigos_origen = np.fromiter(
+            (indices.setdefault(origen, len(indices)) for origen in batch.origenes), dtype=np.intp, count=len(batch)
+        )
+        self.nombres_origen = list(indices)
+
+    def valor_inventario(self):
+        return float(np.dot(self.precios, self.stocks))
+
+    def _resumen(self, codigos, etiquetas):
+        cantidad = np.bincount(codigos, minlength=len(etiquetas))
+        stock = np.bincount(codigos, weights=self.stocks, minlength=len(etiquetas))
+        valor = np.bincount(codigos, weights=self.precios * self.stocks, minlength=len(etiquetas))
+        return {
+            etiqueta: {"productos": int(cantidad[i]), "stock": int(stock[i]), "valor": float(valor[i])}
+            for i, etiqueta in enumerate(etiquetas) if cantidad[i]
+        }
+
+    def resumen_por_origen(self):
+        return self._resumen(self.codigos_origen, self.nombres_origen)
+
+    def resumen_por_tipo(self):
+        return self._resumen(self.tipos.astype(np.intp), self.batch.TIPOS)
+
+    def por_vencer(self, dias, hoy=None):
+        # Indices de productos alimenticios que vencen entre hoy y hoy + dias
+        hoy = (hoy or date.today()).toordinal()
+        mascara = (self.tipos == 1) & (self.fechas >= hoy) & (self.fechas <= hoy + dias)
+        return np.flatnonzero(mascara)
+
+    def vencidos(self, hoy=None):
+        hoy = (hoy or date.today()).toordinal()
+        return np.flatnonzero((self.tipos == 1) & (self.fechas < hoy))
+
+    def electronicos_por_antiguedad(self, tramos_anios=(1, 3, 5, 10), hoy=None):
+        # Cantidad de electronicos por tramo de antiguedad de fabricacion, en años
+        hoy = (hoy or date.today()).toordinal()
+        antiguedad = (hoy - self.fechas[self.tipos == 2]) / 365.25
+        limites = np.array(tramos_anios, dtype=np.float64)
+        conteo = np.bincount(np.searchsorted(limites, antiguedad, side='right'), minlength=len(limites) + 1)
+        etiquetas = [f"< {limites[0]:g}"] + [f"{a:g}-{b:g}" for a, b in zip(limites, limites[1:])] + [f">= {limites[-1]:g}"]
+        return dict(zip(etiquetas, conteo.tolist()))
+
+class AnalisisSQL:
+    def __init__(self, gestion):
+        self.gestion = gestion
+
+    def _consultar(self, query, parametros=()):
+        connection = None
+        try:
+            connection = self.gestion.connect()
+            if connection:
+                with connection.cursor(dictionary=True) as cursor:
+                    cursor.execute(query, parametros)
+                    return cursor.fetchall()
+        finally:
+            self.gestion.cerrar_conexion(connection)
+        return []
+
+    def _desde_productos(self):
+        return f"FROM ({SELECT_PRODUCTOS[self.gestion.esquema]}) t"
+
+    def valor_inventario(self):
+        filas = self._consultar(f"SELECT COALESCE(SUM(t.Precio * t.Stock), 0) AS valor {self._desde_productos()}")
+        return float(filas[0]['valor']) if filas else 0.0
+
+    def resumen_por_origen(self):
+        return self._consultar(f"""
+            SELECT t.Origen AS origen, COUNT(*) AS productos, SUM(t.Stock) AS stock, SUM(t.Precio * t.Stock) AS valor
+            {self._desde_productos()}
+            GROUP BY t.Origen
+            ORDER BY valor DESC
+        """)
+
+    def resumen_por_tipo(self):
+        return self._consultar(f"""
+            SELECT {TIPO_SQL} AS tipo, COUNT(*) AS productos, SUM(t.Stock) AS stock, SUM(t.Precio * t.Stock) AS valor
+            {self._desde_productos()}
+            GROUP BY tipo
+        """)
+
+    # Las fechas se calculan en Python: las consultas son las mismas en MySQL y SQLite
+    def por_vencer(self, dias, hoy=None):
+        hoy = hoy or date.today()
+        return self._consultar(f"""
+            SELECT t.Nombre, t.Stock, t.fecha_vencimiento
+            {self._desde_productos()}
+            WHERE t.fecha_vencimiento BETWEEN %s AND %s
+            ORDER BY t.fecha_vencimiento
+        """, (hoy, hoy + timedelta(days=dias)))
+
+    def electronicos_por_antiguedad(self, hoy=None):
+        anios, parametros = self.gestion.backend.anios_desde('t.fecha_fabricacion', hoy or date.today())
+        return self._consultar(f"""
+            SELECT {anios} AS anios, COUNT(*) AS productos
+            {self._desde_productos()}
+            WHERE t.fecha_fabricacion IS NOT NULL
+            GROUP BY anios
+            ORDER BY anios
+        """, parametros)
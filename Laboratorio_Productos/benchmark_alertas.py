@@ -0,0 +1,97 @@
+""" Costo de revisar alertas (MonitorAlertas) contra recorrer el catalogo, con SQLite.
+
+Uso: python benchmark_alertas.py [cantidad_productos] [cambios_por_revision]
+Crea un catalogo temporal con vencimientos repartidos en dos años y stock entre 0 y 100,
+mide la primera revision (carga por indice), revisiones con algunos cambios entre una y otra
+(avanzando la fecha tres dias por revision)
+y un recorrido completo con leer_todos_productos. Verifica que las alertas acumuladas
+coincidan con las que da el recorrido completo.
+ """
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from almacenamiento import crear_backend
+from clases import GestionProductos, ProductoAlimenticio, ProductoElectronico
+from modelos import parsear_fecha
+
+def alertas_por_recorrido(gestion, hoy, dias, stock_minimo):
+    aviso = hoy + timedelta(days=dias)
+    vencimientos, stock_bajo = set(), set()
+    for producto in gestion.leer_todos_productos():
+        fecha = producto['fecha_vencimiento']
+        if fecha and hoy <= parsear_fecha(fecha) <= aviso:
+            vencimientos.add(producto['Nombre'])
+        if producto['Stock'] < stock_minimo:
+            stock_bajo.add(producto['Nombre'])
+    return vencimientos, stock_bajo
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    cambios = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    aleatorio = random.Random(42)
+    hoy = date.today()
+
+    salida = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        gestion = GestionProductos(backend=crear_backend('sqlite', ruta=os.path.join(tempfile.mkdtemp(), 'alertas.db')))
+        gestion.cache.tamano_maximo = 0
+        gestion.snapshot_ttl = 0
+        gestion.crear_tablas()
+        gestion.crear_productos(
+            (ProductoAlimenticio(f"alim{i:07d}", 10, aleatorio.randint(0, 100), "Arg",
+                                 hoy + timedelta(days=aleatorio.randint(0, 730)))
+             if i % 2 else ProductoElectronico(f"elec{i:07d}", 10, aleatorio.randint(0, 100), "Arg", "2020-01-01")
+             for i in range(cantidad)),
+            tamano_lote=5000
+        )
+        monitor = gestion.alertas
+        vencimientos, stock_bajo = set(), set()
+
+        def revisar(dia):
+            for alerta in gestion.revisar_alertas(dia):
+                (vencimientos if alerta['tipo'] == 'vencimiento' else stock_bajo).add(alerta['Nombre'])
+
+        inicio = time.perf_counter()
+        revisar(hoy)
+        primera = (time.perf_counter() - inicio) * 1000
+
+        # revisiones con algunos cambios de stock y de vencimiento entre una y otra; cada
+        # revision avanza tres dias, para pasar por la extension del horizonte de vencimientos
+        tiempos = []
+        for _ in range(20):
+            hoy += timedelta(days=3)
+            for _ in range(cambios):
+                i = aleatorio.randrange(cantidad)
+                if i % 2:
+                    gestion.eliminar_producto(f"alim{i:07d}")
+                    gestion.crear_producto(ProductoAlimenticio(f"alim{i:07d}", 10, aleatorio.randint(0, 100), "Arg",
+                                                               hoy + timedelta(days=aleatorio.randint(0, 30))))
+                else:
+                    gestion.ajustar_stock_producto(f"elec{i:07d}", aleatorio.randint(-50, 50))
+            inicio = time.perf_counter()
+            revisar(hoy)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+
+        inicio = time.perf_counter()
+        esperados = alertas_por_recorrido(gestion, hoy, monitor.dias_vencimiento, monitor.stock_minimo)
+        recorrido = (time.perf_counter() - inicio) * 1000
+        # lo avisado y que sigue en alerta debe coincidir con el recorrido completo
+        aviso = hoy + timedelta(days=monitor.dias_vencimiento)
+        vigentes_vencimiento = {nombre for nombre in vencimientos
+                                if hoy <= monitor.fechas.get(nombre, hoy - timedelta(days=1)) <= aviso}
+        ok = vigentes_vencimiento == esperados[0] and stock_bajo & monitor.stock_bajo == esperados[1]
+    finally:
+        sys.stdout.close()
+        sys.stdout = salida
+
+    tiempos.sort()
+    print(f"primera revision (carga por indice): {primera:8.2f} ms")
+    print(f"revision con {cambios} cambios (p50):   {tiempos[len(tiempos) // 2]:8.2f} ms")
+    print(f"recorrido con leer_todos_productos:  {recorrido:8.2f} ms")
+    print(f"alertas iguales al recorrido:        {'ok' if ok else 'FALLA'}")
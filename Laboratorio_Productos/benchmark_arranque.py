@@ -0,0 +1,66 @@
+""" Tiempo de importacion de los modulos del catalogo, con presupuesto de regresion.
+
+Uso: python benchmark_arranque.py [repeticiones] [--presupuesto MS]
+Mide con `python -X importtime` (en procesos nuevos) el tiempo acumulado de importar cada
+modulo y falla (codigo de salida 1) si la mediana de clases supera el presupuesto, o si importar
+clases y crear un GestionProductos carga el driver de la base o la configuracion.
+ """
+
+import os
+import statistics
+import subprocess
+import sys
+
+MODULOS = ('modelos', 'clases', 'comandos', 'importacion')
+PRESUPUESTO_MS = 40
+
+# Importar clases, validar un producto y crear GestionProductos no debe cargar nada de esto
+PEREZOSOS = ('mysql.connector', 'decouple', 'sqlite3')
+
+def tiempo_importacion(modulo):
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    for linea in reversed(resultado.stderr.splitlines()):
+        campos = linea.split('|')
+        if len(campos) == 3 and campos[2].strip() == modulo:
+            return int(campos[1]) / 1000
+    raise RuntimeError(f"No se encontro {modulo} en la salida de -X importtime")
+
+def modulos_cargados():
+    codigo = (
+        "import sys\n"
+        "from clases import GestionProductos, ProductoAlimenticio\n"
+        "ProductoAlimenticio('Leche', 10, 5, 'Arg', '2030-01-01')\n"
+        "GestionProductos()\n"
+        f"print(','.join(m for m in {PEREZOSOS!r} if m in sys.modules))\n"
+    )
+    resultado = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    return [modulo for modulo in resultado.stdout.strip().split(',') if modulo]
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    presupuesto = PRESUPUESTO_MS
+    if '--presupuesto' in argumentos:
+        posicion = argumentos.index('--presupuesto')
+        presupuesto = float(argumentos[posicion + 1])
+        del argumentos[posicion:posicion + 2]
+    repeticiones = int(argumentos[0]) if argumentos else 7
+
+    medianas = {}
+    for modulo in MODULOS:
+        medianas[modulo] = statistics.median(tiempo_importacion(modulo) for _ in range(repeticiones))
+        print(f"{modulo:14s}{medianas[modulo]:8.1f} ms")
+
+    fallas = []
+    if medianas['clases'] > presupuesto:
+        fallas.append(f"importar clases tarda {medianas['clases']:.1f} ms (presupuesto {presupuesto:.0f} ms)")
+    cargados = modulos_cargados()
+    if cargados:
+        fallas.append(f"importar clases y crear GestionProductos carga: {', '.join(cargados)}")
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    sys.exit(1 if fallas else 0)
@@ -0,0 +1,41 @@
+""" Throughput de AsyncGestionProductos.leer_producto con 1, 10 y 100 pedidos en vuelo.
+
+Uso: python benchmark_async.py [nombre_producto] [pedidos]
+Requiere la base MySQL configurada en el archivo .env (conviene DB_POOL_SIZE alto, p. ej. 32).
+Antes de medir verifica que actualizar el stock con el mismo valor se informe como exitoso.
+ """
+
+import asyncio
+import sys
+import time
+
+from gestion_async import AsyncGestionProductos
+
+async def medir(gestion, nombre, pedidos, concurrencia):
+    semaforo = asyncio.Semaphore(concurrencia)
+
+    async def pedido():
+        async with semaforo:
+            await gestion.leer_producto(nombre)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(pedido() for _ in range(pedidos)))
+    return pedidos / (time.perf_counter() - inicio)
+
+async def main(nombre, pedidos):
+    async with AsyncGestionProductos() as gestion:
+        gestion.cache.tamano_maximo = 0  # medir la base, no la cache
+        producto = await gestion.leer_producto(nombre)
+        if producto is None:
+            return
+        # con el mismo valor el UPDATE no cambia filas, pero el producto existe
+        mismo_valor = await gestion.actualizar_stock_producto(nombre, producto['Stock'])
+        print(f"actualizacion con el mismo valor: {'ok' if mismo_valor else 'FALLA'}")
+        for concurrencia in (1, 10, 100):
+            ops = await medir(gestion, nombre, pedidos, concurrencia)
+            print(f"{concurrencia:4d} en vuelo: {ops:10.1f} ops/seg")
+
+if __name__ == "__main__":
+    nombre = sys.argv[1] if len(sys.argv) > 1 else 'Tomate'
+    pedidos = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    asyncio.run(main(nombre, pedidos))
@@ -0,0 +1,72 @@
+""" Latencia por operacion de GestionProductos en cada backend de almacenamiento.
+
+Uso: python benchmark_backends.py [motor ...] [--operaciones N]
+Motores: sqlite (archivo temporal) y mysql (base del archivo .env, usa productos con prefijo bench_
+que se eliminan al terminar). Por defecto solo sqlite.
+Ademas de medir, verifica el resultado de cada operacion medida; las pruebas de conformidad
+completas estan en test_conformidad_backends.py.
+ """
+
+import os
+import sys
+import tempfile
+import time
+
+from almacenamiento import crear_backend
+from clases import GestionProductos, ProductoAlimenticio
+
+def medir(nombre, funcion, argumentos, verificar):
+    inicio = time.perf_counter()
+    for args in argumentos:
+        resultado = funcion(*args)
+        if not verificar(resultado):
+            raise AssertionError(f"{nombre}{args} devolvio {resultado!r}")
+    return (time.perf_counter() - inicio) / len(argumentos) * 1_000_000
+
+def ejecutar(motor, cantidad):
+    if motor == 'sqlite':
+        ruta = os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+        gestion = GestionProductos(backend=crear_backend('sqlite', ruta=ruta))
+    else:
+        gestion = GestionProductos(backend=motor)
+    gestion.cache.tamano_maximo = 0
+    gestion.crear_tablas()
+
+    nombres = [f"bench_{i:06d}" for i in range(cantidad)]
+    productos = [(ProductoAlimenticio(nombre, 10, 100, "Arg", "2030-01-01"),) for nombre in nombres]
+    una_vez = [(nombre,) for nombre in nombres]
+
+    resultados = {
+        'crear_producto': medir('crear_producto', gestion.crear_producto, productos, lambda r: True),
+        'leer_producto': medir('leer_producto', gestion.leer_producto, una_vez, lambda r: r and r['Stock'] == 100),
+        'actualizar_precio': medir('actualizar_precio', gestion.actualizar_precio_producto,
+                                   [(nombre, 20) for nombre in nombres], lambda r: r is True),
+        'ajustar_stock': medir('ajustar_stock', gestion.ajustar_stock_producto,
+                               [(nombre, -1) for nombre in nombres], lambda r: r == 99),
+        'eliminar_producto': medir('eliminar_producto', gestion.eliminar_producto, una_vez, lambda r: r is True),
+    }
+    return resultados
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    cantidad = 500
+    if '--operaciones' in argumentos:
+        posicion = argumentos.index('--operaciones')
+        cantidad = int(argumentos[posicion + 1])
+        del argumentos[posicion:posicion + 2]
+    motores = argumentos or ['sqlite']
+
+    # los metodos imprimen un mensaje por operacion: se silencian durante la medicion
+    salida = sys.stdout
+    tabla = {}
+    for motor in motores:
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            tabla[motor] = ejecutar(motor, cantidad)
+        finally:
+            sys.stdout.close()
+            sys.stdout = salida
+
+    print(f"{'operacion':20s}" + "".join(f"{motor:>14s}" for motor in motores) + "   (µs/op)")
+    for operacion in tabla[motores[0]]:
+        print(f"{operacion:20s}" + "".join(f"{tabla[motor][operacion]:14.1f}" for motor in motores))
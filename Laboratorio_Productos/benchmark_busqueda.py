@@ -0,0 +1,50 @@
+""" Latencia del indice de busqueda por nombre (IndiceNombres) sin base de datos.
+
+Uso: python benchmark_busqueda.py [cantidad_nombres] [consultas]
+Genera nombres sinteticos (p. ej. "Auricular Lenovo 004217"), arma el indice y mide
+cada modo de busqueda con consultas tomadas de los mismos nombres.
+ """
+
+import random
+import sys
+import time
+
+from busqueda import MODOS, IndiceNombres
+
+ARTICULOS = ['Auricular', 'Teclado', 'Monitor', 'Leche', 'Yogur', 'Galletita', 'Cafe', 'Notebook', 'Parlante', 'Arroz']
+MARCAS = ['Lenovo', 'Samsung', 'Serenisima', 'Arcor', 'Logitech', 'Philips', 'Gallo', 'Noblex', 'Bagley', 'Sony']
+
+def generar_nombres(cantidad, aleatorio):
+    return [f"{aleatorio.choice(ARTICULOS)} {aleatorio.choice(MARCAS)} {i:07d}" for i in range(cantidad)]
+
+def consultas_para(modo, nombres, cantidad, aleatorio):
+    muestra = aleatorio.sample(nombres, cantidad)
+    if modo == 'prefijo':
+        return [nombre[:12] for nombre in muestra]
+    if modo == 'subcadena':
+        return [nombre[-9:-2] for nombre in muestra]
+    # un error de tipeo: se intercambian dos letras
+    return [nombre[:3] + nombre[4] + nombre[3] + nombre[5:] for nombre in muestra]
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    aleatorio = random.Random(42)
+    nombres = generar_nombres(cantidad, aleatorio)
+
+    inicio = time.perf_counter()
+    indice = IndiceNombres()
+    indice.cargar(nombres)
+    print(f"indice de {len(indice)} nombres armado en {time.perf_counter() - inicio:.1f} s")
+
+    for modo in MODOS:
+        latencias = []
+        total = 0
+        for texto in consultas_para(modo, nombres, consultas, aleatorio):
+            inicio = time.perf_counter()
+            total += indice.buscar(texto, modo)[1]
+            latencias.append(time.perf_counter() - inicio)
+        latencias.sort()
+        print(f"{modo:12s} p50 {latencias[len(latencias) // 2] * 1000:8.3f} ms   "
+              f"p99 {latencias[int(len(latencias) * 0.99)] * 1000:8.3f} ms   "
+              f"{total / consultas:10.1f} resultados/consulta")
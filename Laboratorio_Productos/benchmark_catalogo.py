@@ -0,0 +1,179 @@
+""" Benchmark reproducible de las operaciones CRUD del catalogo.
+
+Siembra un catalogo de N productos generados (mitad ProductoElectronico, mitad ProductoAlimenticio),
+ejecuta cada operacion con una concurrencia fija de hilos y guarda throughput, percentiles de
+latencia y memoria en un JSON para comparar corridas.
+
+Uso:
+    python benchmark_catalogo.py --tamano 100000 --concurrencia 8 --salida resultado.json
+    python benchmark_catalogo.py --motor mysql --tamano 10000       (usa la base del .env, ATENCION: recrea las tablas)
+    python benchmark_catalogo.py --comparar base.json nuevo.json
+ """
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from almacenamiento import crear_backend
+from clases import GestionProductos, ProductoAlimenticio, ProductoElectronico
+from esquema import eliminar_esquema
+
+ORIGENES = ['Arg', 'China', 'Japon', 'Taiwan', 'Brasil', 'Chile']
+
+def memoria_maxima_mb():
+    # Pico de memoria residente del proceso. resource no existe en Windows: ahi se usa psutil si
+    # esta instalado; si no, None.
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss esta en bytes en macOS y en KB en Linux
+    return maximo / (1024 * 1024) if sys.platform == 'darwin' else maximo / 1024
+
+def nombre_producto(i):
+    return f"bench{i:08d}"
+
+def generar_productos(cantidad, semilla, desde=0):
+    aleatorio = random.Random(semilla)
+    base = date(2020, 1, 1)
+    for i in range(desde, desde + cantidad):
+        fecha = (base + timedelta(days=aleatorio.randrange(3650))).isoformat()
+        datos = (nombre_producto(i), round(aleatorio.uniform(1, 5000), 2), aleatorio.randrange(1000),
+                 aleatorio.choice(ORIGENES))
+        if i % 2:
+            yield ProductoAlimenticio(*datos, fecha)
+        else:
+            yield ProductoElectronico(*datos, fecha)
+
+def percentiles(latencias):
+    ordenadas = sorted(latencias)
+    def p(valor):
+        return ordenadas[min(len(ordenadas) - 1, int(valor / 100 * len(ordenadas)))] * 1e6
+    return {'p50_us': p(50), 'p95_us': p(95), 'p99_us': p(99), 'max_us': ordenadas[-1] * 1e6}
+
+def ejecutar_operacion(funcion, argumentos, concurrencia):
+    def medir(args):
+        inicio = time.perf_counter()
+        funcion(*args)
+        return time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+        latencias = list(ejecutor.map(medir, argumentos))
+    duracion = time.perf_counter() - inicio
+    return {'operaciones': len(latencias), 'ops_por_segundo': len(latencias) / duracion, **percentiles(latencias)}
+
+def preparar_gestion(motor):
+    if motor == 'sqlite':
+        ruta = os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+        gestion = GestionProductos(backend=crear_backend('sqlite', ruta=ruta))
+    else:
+        gestion = GestionProductos(backend=motor)
+    gestion.cache.tamano_maximo = 0
+    gestion.instrumentacion = None
+    connection = gestion.connect()
+    try:
+        eliminar_esquema(connection)
+    finally:
+        gestion.cerrar_conexion(connection)
+    gestion.crear_tablas()
+    return gestion
+
+def correr(motor, tamano, concurrencia, operaciones, semilla):
+    gestion = preparar_gestion(motor)
+    aleatorio = random.Random(semilla)
+
+    inicio = time.perf_counter()
+    gestion.crear_productos(generar_productos(tamano, semilla), tamano_lote=5000)
+    siembra = time.perf_counter() - inicio
+
+    muestra = [(nombre_producto(aleatorio.randrange(tamano)),) for _ in range(operaciones)]
+    nuevos = [(producto,) for producto in generar_productos(operaciones, semilla + 1, desde=tamano)]
+
+    resultados = {
+        'crear_producto': ejecutar_operacion(gestion.crear_producto, nuevos, concurrencia),
+        'leer_producto': ejecutar_operacion(gestion.leer_producto, muestra, concurrencia),
+        'actualizar_precio_producto': ejecutar_operacion(
+            gestion.actualizar_precio_producto, [(nombre, aleatorio.uniform(1, 5000)) for (nombre,) in muestra], concurrencia),
+        'actualizar_stock_producto': ejecutar_operacion(
+            gestion.actualizar_stock_producto, [(nombre, aleatorio.randrange(1000)) for (nombre,) in muestra], concurrencia),
+        'ajustar_stock_producto': ejecutar_operacion(
+            gestion.ajustar_stock_producto, [(nombre, 1) for (nombre,) in muestra], concurrencia),
+    }
+
+    inicio = time.perf_counter()
+    total = sum(1 for _ in gestion.iterar_productos(tamano_pagina=5000))
+    duracion = time.perf_counter() - inicio
+    resultados['iterar_productos'] = {'operaciones': 1, 'filas': total, 'filas_por_segundo': total / duracion}
+
+    resultados['eliminar_producto'] = ejecutar_operacion(gestion.eliminar_producto, [(p.nombre,) for (p,) in nuevos], concurrencia)
+
+    return {
+        'motor': motor,
+        'tamano': tamano,
+        'concurrencia': concurrencia,
+        'semilla': semilla,
+        'python': platform.python_version(),
+        'siembra_productos_por_segundo': tamano / siembra,
+        'memoria_maxima_mb': memoria_maxima_mb(),
+        'operaciones': resultados,
+    }
+
+def comparar(ruta_base, ruta_nueva):
+    with open(ruta_base, encoding='utf-8') as archivo:
+        base = json.load(archivo)
+    with open(ruta_nueva, encoding='utf-8') as archivo:
+        nueva = json.load(archivo)
+
+    print(f"{'operacion':28s}{'metrica':18s}{'base':>12s}{'nueva':>12s}{'cambio':>10s}")
+    for operacion, datos in nueva['operaciones'].items():
+        for metrica in ('ops_por_segundo', 'filas_por_segundo', 'p50_us', 'p99_us'):
+            if metrica in datos and metrica in base['operaciones'].get(operacion, {}):
+                anterior = base['operaciones'][operacion][metrica]
+                cambio = (datos[metrica] - anterior) / anterior * 100 if anterior else 0.0
+                print(f"{operacion:28s}{metrica:18s}{anterior:12.1f}{datos[metrica]:12.1f}{cambio:+9.1f}%")
+    if base.get('memoria_maxima_mb') is not None and nueva.get('memoria_maxima_mb') is not None:
+        print(f"{'memoria_maxima_mb':46s}{base['memoria_maxima_mb']:12.1f}{nueva['memoria_maxima_mb']:12.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de operaciones del catalogo de productos")
+    parser.add_argument('--motor', default='sqlite', choices=['sqlite', 'mysql'])
+    parser.add_argument('--tamano', type=int, default=10_000, help="productos sembrados (p. ej. 10000, 100000, 1000000)")
+    parser.add_argument('--concurrencia', type=int, default=4)
+    parser.add_argument('--operaciones', type=int, default=2000, help="operaciones medidas por tipo")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', help="archivo JSON donde guardar el resultado")
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NUEVA'))
+    argumentos = parser.parse_args()
+
+    if argumentos.comparar:
+        comparar(*argumentos.comparar)
+        sys.exit(0)
+
+    # los metodos de GestionProductos imprimen un mensaje por operacion
+    salida = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        resultado = correr(argumentos.motor, argumentos.tamano, argumentos.concurrencia,
+                           argumentos.operaciones, argumentos.semilla)
+    finally:
+        sys.stdout.close()
+        sys.stdout = salida
+
+    texto = json.dumps(resultado, indent=2)
+    if argumentos.salida:
+        with open(argumentos.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto + '\n')
+    print(texto)
@@ -0,0 +1,58 @@
+""" Compara los diseños de esquema (normalizado vs tabla_unica) en lecturas puntuales y recorrido completo.
+
+Uso: python benchmark_esquema.py base_de_datos_de_prueba [cantidad_productos] [lecturas]
+ATENCION: borra y vuelve a crear las tablas de productos en la base indicada.
+ """
+
+import random
+import sys
+import time
+
+from clases import GestionProductos, ProductoAlimenticio, ProductoElectronico
+from esquema import ESQUEMAS, crear_esquema, eliminar_esquema
+
+def generar_productos(cantidad):
+    for i in range(cantidad):
+        if i % 2:
+            yield ProductoAlimenticio(f"alimento{i:07d}", 10 + i % 90, i % 500, "Arg", "2030-01-01")
+        else:
+            yield ProductoElectronico(f"electronico{i:07d}", 100 + i % 900, i % 50, "China", "2020-06-15")
+
+def preparar(gestion, cantidad):
+    connection = gestion.connect()
+    try:
+        eliminar_esquema(connection)
+        crear_esquema(connection, gestion.esquema)
+    finally:
+        gestion.cerrar_conexion(connection)
+    gestion.crear_productos(generar_productos(cantidad), tamano_lote=5000)
+
+def medir(gestion, cantidad, lecturas):
+    nombres = [f"alimento{i:07d}" if i % 2 else f"electronico{i:07d}"
+               for i in random.sample(range(cantidad), min(lecturas, cantidad))]
+    inicio = time.perf_counter()
+    for nombre in nombres:
+        gestion.leer_producto(nombre)
+    lectura = (time.perf_counter() - inicio) / len(nombres) * 1000
+
+    inicio = time.perf_counter()
+    total = sum(1 for _ in gestion.iterar_productos(tamano_pagina=5000))
+    recorrido = time.perf_counter() - inicio
+    return lectura, recorrido, total
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    base = sys.argv[1]
+    cantidad = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    lecturas = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    for esquema in ESQUEMAS:
+        gestion = GestionProductos()
+        gestion.backend.database = base
+        gestion.esquema = esquema
+        gestion.cache.tamano_maximo = 0
+        preparar(gestion, cantidad)
+        lectura, recorrido, total = medir(gestion, cantidad, lecturas)
+        print(f"{esquema:12s} leer_producto: {lectura:8.3f} ms/op   recorrido de {total} productos: {recorrido:8.2f} s")
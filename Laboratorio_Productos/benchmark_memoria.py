@@ -0,0 +1,47 @@
+""" Mide la memoria por producto de las distintas representaciones del catalogo.
+
+Uso: python benchmark_memoria.py [cantidad_productos]
+No necesita base de datos: genera filas con el mismo formato que leer_todos_productos.
+ """
+
+import sys
+import tracemalloc
+from datetime import date
+
+from clases import ProductoAlimenticio, ProductoBatch, ProductoElectronico
+
+ORIGENES = ['Arg', 'China', 'Japon', 'Taiwan', 'Brasil']
+
+def generar_filas(cantidad):
+    for i in range(cantidad):
+        alimenticio = i % 2 == 1
+        fecha = date(2020 + i % 10, 1 + i % 12, 1 + i % 28)
+        yield {
+            'Nombre': f"Producto{i:07d}",
+            'Precio': 10.0 + i % 1000,
+            'Stock': i % 500,
+            'Origen': ORIGENES[i % len(ORIGENES)],
+            'fecha_vencimiento': fecha if alimenticio else None,
+            'fecha_fabricacion': None if alimenticio else fecha,
+        }
+
+def a_producto(fila):
+    datos = (fila['Nombre'], fila['Precio'], fila['Stock'], fila['Origen'])
+    if fila['fecha_vencimiento']:
+        return ProductoAlimenticio(*datos, fila['fecha_vencimiento'].isoformat())
+    return ProductoElectronico(*datos, fila['fecha_fabricacion'].isoformat())
+
+def medir(nombre, construir, cantidad):
+    tracemalloc.start()
+    coleccion = construir()
+    usado, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nombre:20s} {usado / cantidad:8.1f} bytes/producto")
+    return coleccion
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    medir("filas (dict)", lambda: list(generar_filas(cantidad)), cantidad)
+    medir("objetos Producto", lambda: [a_producto(fila) for fila in generar_filas(cantidad)], cantidad)
+    medir("ProductoBatch", lambda: ProductoBatch.desde_filas(generar_filas(cantidad)), cantidad)
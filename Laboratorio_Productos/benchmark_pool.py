@@ -0,0 +1,29 @@
+""" Compara operaciones por segundo de GestionProductos con y sin pool de conexiones.
+
+Uso: python benchmark_pool.py [nombre_producto] [repeticiones]
+Requiere la base MySQL configurada en el archivo .env
+ """
+
+import sys
+import time
+
+from clases import GestionProductos
+
+def medir(gestion, nombre, repeticiones):
+    # sin cache, cada lectura va a la base: se mide el costo de obtener la conexion
+    gestion.cache.tamano_maximo = 0
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        gestion.leer_producto(nombre)
+    return repeticiones / (time.perf_counter() - inicio)
+
+if __name__ == "__main__":
+    nombre = sys.argv[1] if len(sys.argv) > 1 else 'Tomate'
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    sin_pool = medir(GestionProductos(usar_pool=False), nombre, repeticiones)
+    con_pool = medir(GestionProductos(usar_pool=True), nombre, repeticiones)
+
+    print(f"Sin pool: {sin_pool:10.1f} ops/seg")
+    print(f"Con pool: {con_pool:10.1f} ops/seg")
+    print(f"Mejora:   {con_pool / sin_pool:10.2f}x")
@@ -0,0 +1,66 @@
+""" Ruteo de lecturas a replicas y copia en memoria de leer_todos_productos, con SQLite.
+
+Uso: python benchmark_replicas.py [cantidad_productos]
+Usa dos archivos SQLite temporales como primario y replica; la "replicacion" es una copia
+con la API de backup de sqlite3, asi se puede ver el retraso de la replica. Verifica el ruteo
+(lecturas a la replica, escrituras al primario, leer lo propio tras escribir) y mide
+leer_todos_productos con y sin la copia en memoria.
+ """
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from almacenamiento import crear_backend
+from clases import GestionProductos, ProductoAlimenticio
+
+def replicar(primario, replica):
+    with sqlite3.connect(primario) as origen, sqlite3.connect(replica) as destino:
+        origen.backup(destino)
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    directorio = tempfile.mkdtemp()
+    primario = os.path.join(directorio, 'primario.db')
+    replica = os.path.join(directorio, 'replica.db')
+
+    salida = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        gestion = GestionProductos(backend=crear_backend('sqlite', ruta=primario), replicas=[replica])
+        gestion.cache.tamano_maximo = 0
+        gestion.crear_tablas()
+        gestion.crear_productos((ProductoAlimenticio(f"prod{i:07d}", 10, 5, "Arg", "2030-01-01")
+                                 for i in range(cantidad)), tamano_lote=5000)
+        replicar(primario, replica)
+
+        # escritura en el primario que la replica todavia no tiene
+        gestion.ventana_escritura = 0.2
+        gestion.crear_producto(ProductoAlimenticio("nuevo", 10, 5, "Arg", "2030-01-01"))
+        visto_tras_escribir = gestion.leer_producto("nuevo") is not None
+        time.sleep(0.25)
+        visto_en_replica = gestion.leer_producto("nuevo") is not None
+        replicar(primario, replica)
+        visto_tras_replicar = gestion.leer_producto("nuevo") is not None
+
+        gestion.snapshot_ttl = 0
+        sin_copia = medir(gestion.leer_todos_productos, 5)
+        gestion.snapshot_ttl = 60
+        gestion.leer_todos_productos()
+        con_copia = medir(gestion.leer_todos_productos, 50)
+    finally:
+        sys.stdout.close()
+        sys.stdout = salida
+
+    print(f"leer lo propio tras escribir (primario):   {'ok' if visto_tras_escribir else 'FALLA'}")
+    print(f"pasada la ventana lee la replica atrasada: {'ok' if not visto_en_replica else 'FALLA'}")
+    print(f"despues de replicar la replica lo ve:      {'ok' if visto_tras_replicar else 'FALLA'}")
+    print(f"leer_todos_productos ({cantidad + 1} productos): {sin_copia:8.2f} ms sin copia, {con_copia:8.3f} ms con copia")
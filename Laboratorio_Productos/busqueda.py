@@ -0,0 +1,190 @@
+""" Busqueda de productos por nombre parcial.
+
+IndiceNombres mantiene en memoria los nombres del catalogo con dos estructuras:
+- una lista ordenada de nombres en minusculas: busqueda por prefijo con bisect (O(log n + k)).
+- un indice de trigramas (trigrama -> ids): busqueda por subcadena y aproximada sin recorrer
+  todo el catalogo.
+
+BusquedaProductos arma el indice la primera vez desde la base y lo mantiene al dia con el
+registro de cambios (GestionProductos.cambios_desde), asi ve tambien las escrituras de otros
+procesos. Las escrituras propias marcan el indice como pendiente y se aplican en la busqueda siguiente.
+ """
+
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+
+MODOS = ('prefijo', 'subcadena', 'aproximado')
+
+class IndiceNombres:
+    # Busqueda aproximada: se cuentan trigramas en comun recorriendo como maximo PRESUPUESTO ids
+    # (empezando por los trigramas mas raros) y se calcula la similitud exacta de los CANDIDATOS
+    # nombres con mas trigramas en comun.
+    PRESUPUESTO_APROXIMADO = 20_000
+    CANDIDATOS_APROXIMADO = 100
+    SIMILITUD_MINIMA = 0.3
+
+    def __init__(self, presupuesto_aproximado=None):
+        # presupuesto_aproximado: ids a recorrer en la busqueda aproximada (BUSQUEDA_PRESUPUESTO_APROXIMADO)
+        self.presupuesto_aproximado = presupuesto_aproximado or self.PRESUPUESTO_APROXIMADO
+        self.nombres = []       # id -> nombre (None si se elimino)
+        self.claves = []        # id -> nombre en minusculas
+        self.__ids = {}         # nombre en minusculas -> id
+        self.ordenados = []     # nombres en minusculas, ordenados
+        self.trigramas = {}     # trigrama -> array de ids
+        self.__eliminados = 0
+
+    def __len__(self):
+        return len(self.__ids)
+
+    @staticmethod
+    def _trigramas(clave):
+        # con relleno, para que el principio y el final del nombre pesen en la similitud
+        relleno = f"  {clave} "
+        return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+    def _indexar(self, nombre):
+        clave = nombre.lower()
+        if clave in self.__ids:
+            return None
+        id_nombre = len(self.nombres)
+        self.nombres.append(nombre)
+        self.claves.append(clave)
+        self.__ids[clave] = id_nombre
+        for trigrama in self._trigramas(clave):
+            ids = self.trigramas.get(trigrama)
+            if ids is None:
+                ids = self.trigramas[trigrama] = array('i')
+            ids.append(id_nombre)
+        return clave
+
+    def cargar(self, nombres):
+        for nombre in nombres:
+            self._indexar(nombre)
+        self.ordenados = sorted(self.__ids)
+
+    def agregar(self, nombre):
+        clave = self._indexar(nombre)
+        if clave is not None:
+            insort(self.ordenados, clave)
+
+    def eliminar(self, nombre):
+        clave = nombre.lower()
+        id_nombre = self.__ids.pop(clave, None)
+        if id_nombre is None:
+            return
+        self.nombres[id_nombre] = None
+        self.claves[id_nombre] = None
+        del self.ordenados[bisect_left(self.ordenados, clave)]
+        # los ids eliminados quedan en los trigramas y se descartan al buscar;
+        # cuando son muchos se reconstruye el indice
+        self.__eliminados += 1
+        if self.__eliminados > 1000 and self.__eliminados > len(self.__ids) // 4:
+            vigentes = [nombre for nombre in self.nombres if nombre is not None]
+            self.__init__(self.presupuesto_aproximado)
+            self.cargar(vigentes)
+
+    # Cada modo devuelve (nombres de la pagina, total de coincidencias), ordenados por relevancia
+
+    def buscar_prefijo(self, texto, desplazamiento=0, limite=20):
+        # orden alfabetico; solo se arman los nombres de la pagina pedida
+        clave = texto.lower()
+        inicio, fin = 0, len(self.ordenados)
+        if clave:
+            inicio = bisect_left(self.ordenados, clave)
+            fin = bisect_left(self.ordenados, clave[:-1] + chr(ord(clave[-1]) + 1), inicio)
+        pagina = self.ordenados[inicio + desplazamiento:min(fin, inicio + desplazamiento + limite)]
+        return [self.nombres[self.__ids[c]] for c in pagina], fin - inicio
+
+    def buscar_subcadena(self, texto, desplazamiento=0, limite=20):
+        clave = texto.lower()
+        claves = self.claves
+        trigramas = [clave[i:i + 3] for i in range(len(clave) - 2)]
+        if trigramas:
+            # basta con recorrer los ids del trigrama menos frecuente y verificar cada nombre
+            candidatos = min((self.trigramas.get(t, ()) for t in trigramas), key=len)
+            ids = [i for i in candidatos if claves[i] is not None and clave in claves[i]]
+        else:
+            # menos de 3 caracteres: no hay trigrama completo, se recorre el catalogo
+            ids = [i for c, i in self.__ids.items() if clave in c]
+        # primero las coincidencias al principio del nombre, luego los nombres mas cortos
+        ids.sort(key=lambda i: (claves[i].find(clave), len(claves[i]), claves[i]))
+        return [self.nombres[i] for i in ids[desplazamiento:desplazamiento + limite]], len(ids)
+
+    def buscar_aproximado(self, texto, desplazamiento=0, limite=20):
+        trigramas = self._trigramas(texto.lower())
+        conteos = Counter()
+        revisados = 0
+        for ids in sorted((self.trigramas.get(t, ()) for t in trigramas), key=len):
+            if conteos and revisados + len(ids) > self.presupuesto_aproximado:
+                break
+            conteos.update(ids)
+            revisados += len(ids)
+
+        # similitud de Jaccard entre los trigramas de la consulta y los de cada candidato
+        puntajes = []
+        for id_nombre, _ in conteos.most_common(self.CANDIDATOS_APROXIMADO):
+            clave = self.claves[id_nombre]
+            if clave is None:
+                continue
+            trigramas_nombre = self._trigramas(clave)
+            comunes = len(trigramas & trigramas_nombre)
+            similitud = comunes / (len(trigramas) + len(trigramas_nombre) - comunes)
+            if similitud >= self.SIMILITUD_MINIMA:
+                puntajes.append((-similitud, len(clave), clave, id_nombre))
+        puntajes.sort()
+        return [self.nombres[i] for *_, i in puntajes[desplazamiento:desplazamiento + limite]], len(puntajes)
+
+    def buscar(self, texto, modo='subcadena', desplazamiento=0, limite=20):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de busqueda desconocido: {modo}. Opciones: {', '.join(MODOS)}")
+        return getattr(self, f"buscar_{modo}")(texto, desplazamiento, limite)
+
+class BusquedaProductos:
+    def __init__(self, gestion, intervalo=None, presupuesto_aproximado=None):
+        self.gestion = gestion
+        if intervalo is None or presupuesto_aproximado is None:
+            from decouple import config
+            # cada cuantos segundos se consultan los cambios hechos por otros procesos
+            if intervalo is None:
+                intervalo = config('BUSQUEDA_INTERVALO', default=5, cast=float)
+            if presupuesto_aproximado is None:
+                presupuesto_aproximado = config('BUSQUEDA_PRESUPUESTO_APROXIMADO',
+                                                default=IndiceNombres.PRESUPUESTO_APROXIMADO, cast=int)
+        self.intervalo = intervalo
+        self.presupuesto_aproximado = presupuesto_aproximado
+        self.indice = None
+        self.cambios = None     # SeguimientoCambios desde la carga del indice
+        self.pendiente = False
+        self.__ultima_sincronizacion = 0.0
+        self.__lock = threading.Lock()
+
+    def _sincronizar(self):
+        if self.indice is None:
+            # la version se toma antes de leer, para no perder cambios hechos durante la carga
+            self.cambios = self.gestion.seguir_cambios(self.gestion.version_cambios() or 0)
+            indice = IndiceNombres(self.presupuesto_aproximado)
+            indice.cargar(producto['Nombre'] for producto in self.gestion.iterar_productos(tamano_pagina=5000))
+            self.indice = indice
+        elif self.pendiente or time.monotonic() - self.__ultima_sincronizacion >= self.intervalo:
+            self.pendiente = False
+            # se aplica el estado actual del producto y no la operacion: un cambio repetido
+            # o que llega tarde deja el indice igual
+            for cambio in self.cambios.nuevos():
+                if cambio['producto'] is None:
+                    self.indice.eliminar(cambio['Nombre'])
+                else:
+                    self.indice.agregar(cambio['producto']['Nombre'])
+        else:
+            return
+        self.__ultima_sincronizacion = time.monotonic()
+
+    def buscar(self, texto, modo='subcadena', pagina=1, tamano_pagina=20):
+        # Devuelve (productos de la pagina pedida, total de coincidencias), ordenados por relevancia
+        with self.__lock:
+            self._sincronizar()
+            nombres, total = self.indice.buscar(texto, modo, (pagina - 1) * tamano_pagina, tamano_pagina)
+        encontrados, _ = self.gestion.leer_productos(nombres)
+        return [encontrados[nombre] for nombre in nombres if nombre in encontrados], total
@@ -5,226 +5,489 @@ La persistencia de los datos deberá realizarse en una base de datos SQL.
 Una vez completada la solución, deberás subir el código a un repositorio público en GitHub y proporcionar el enlace correspondiente para su evaluación.
  """
 
-import mysql.connector
-from mysql.connector import Error
-from decouple import config
+# El driver de la base y la configuracion (.env) se cargan recien en el primer uso de
+# GestionProductos: importar este modulo para validar o formatear productos es barato.
+from almacenamiento import crear_backend, crear_replicas
+from alertas import MonitorAlertas
+from busqueda import BusquedaProductos
+from esquema import SELECT_PRODUCTOS, VENCIMIENTO, validar_esquema
+from instrumentacion import crear_instrumentacion, instrumentado
+from modelos import (
+    Producto,
+    ProductoAlimenticio,
+    ProductoBatch,
+    ProductoElectronico,
+    parsear_fecha,
+    serializar_fecha,
+)
 
-from datetime import datetime
-from datetime import date
+import threading
+import time
+from collections import OrderedDict
+from itertools import cycle, groupby, islice
 import traceback
 
-class Producto:
-    def __init__(self, nombre, precio, stock, origen):
-        self.__nombre = nombre
-        self.__precio = self.validar_precio(precio)
-        self.__stock = self.validar_stock(stock)
-        self.__origen = origen
-    
-    @property    
-    def nombre(self):
-        return self.__nombre.capitalize()
-    
-    @property
-    def precio(self):
-        return float(self.__precio)
-    
-    @property
-    def stock(self):
-        return int(self.__stock)
-    
-    @property
-    def origen(self):
-        return self.__origen.capitalize() 
-    
-    #SETTERS
-    
-    @precio.setter
-    def precio(self, nuevo_precio):
-        self.__precio = self.validar_precio(nuevo_precio) 
-
-    @stock.setter
-    def stock(self, nuevo_stock):
-        self.__stock = self.validar_stock(nuevo_stock)
-        
-    @staticmethod
-    def validar_precio(precio):
-        try:
-            precio_num = float(precio)
-            if precio_num <= 0:
-                raise ValueError("El precio debe ser mayor a 0")
-            return precio_num
-        except ValueError as e:
-            raise ValueError(f"Error en el precio: {str(e)}")
-
+class CacheProductos:
+    # Cache LRU con vencimiento (TTL) de filas de productos, indexada por nombre.
+    # Protegida con un lock: GestionProductos puede usarse desde varios hilos.
+    def __init__(self, tamano_maximo=1024, ttl=60):
+        self.tamano_maximo = tamano_maximo
+        self.ttl = ttl
+        self.__filas = OrderedDict()
+        self.__lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+    
     @staticmethod
-    def validar_stock(stock):
-        try:
-            stock_num = int(stock)
-            if stock_num < 0:
-                raise ValueError("El stock no puede ser negativo")
-            return stock_num
-        except ValueError as e:
-            raise ValueError(f"Error en el stock: {str(e)}")
+    def _clave(nombre):
+        return nombre.lower()
+    
+    def obtener(self, nombre):
+        clave = self._clave(nombre)
+        with self.__lock:
+            entrada = self.__filas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            
+            vence, fila = entrada
+            if vence < time.monotonic():
+                del self.__filas[clave]
+                self.fallos += 1
+                return None
+            
+            self.__filas.move_to_end(clave)
+            self.aciertos += 1
+        return dict(fila)
+    
+    def guardar(self, nombre, fila):
+        if self.tamano_maximo <= 0:
+            return
+        clave = self._clave(nombre)
+        with self.__lock:
+            self.__filas[clave] = (time.monotonic() + self.ttl, dict(fila))
+            self.__filas.move_to_end(clave)
+            while len(self.__filas) > self.tamano_maximo:
+                self.__filas.popitem(last=False)
+                self.desalojos += 1
+    
+    def invalidar(self, nombre):
+        with self.__lock:
+            self.__filas.pop(self._clave(nombre), None)
     
+    def limpiar(self):
+        with self.__lock:
+            self.__filas.clear()
     
-    #FUNCIONES
-    def to_dict(self):
+    def estadisticas(self):
         return {
-            "nombre": self.nombre,
-            "precio": self.precio,
-            "stock": self.stock,
-            "origen": self.origen             
+            "tamano": len(self.__filas),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos
         }
-        
-    def __str__(self):
-        return f"{self.nombre}"
     
-class ProductoElectronico(Producto):
-    def __init__(self, nombre, precio, stock, origen, fecha_fabricacion):
-        super().__init__(nombre, precio, stock, origen)        
-        self.__fecha_fabricacion = self.validar_fecha(fecha_fabricacion)
-        
+class TransaccionProductos:
+    # Acumula altas, cambios y bajas y los aplica al salir del bloque with, en una sola
+    # conexion y un solo commit. Si el bloque o la escritura fallan no se aplica nada.
+    def __init__(self, gestion):
+        self.gestion = gestion
+        self.operaciones = []
+        self.resumen = None
     
-    @property
-    def fecha_fabricacion(self):
-        return self.__fecha_fabricacion.strftime('%Y-%m-%d')
+    def crear(self, producto):
+        self.operaciones.append(('crear', producto))
     
-    @fecha_fabricacion.setter
-    def fecha_fabricacion(self, nueva_fecha):
-        self.__fecha_fabricacion = self.validar_fecha(nueva_fecha)
+    def actualizar_precio(self, nombre_producto, nuevo_precio):
+        self.operaciones.append(('precio', nombre_producto, Producto.validar_precio(nuevo_precio)))
     
+    def actualizar_stock(self, nombre_producto, nuevo_stock):
+        self.operaciones.append(('stock', nombre_producto, Producto.validar_stock(nuevo_stock)))
     
-    def validar_fecha(self, fecha):
-        try: 
-            fecha_fabricacion = datetime.strptime(fecha, '%Y-%m-%d')
-            return fecha_fabricacion.date()
-        except ValueError:
-            raise ValueError("Ingrese un formato de fecha correcto: dd-mm-aaaa")
-        
-        
-    def to_dict(self):
-        data = super().to_dict()
-        data['fecha_fabricacion'] = self.fecha_fabricacion 
-        return data
-        
-    def __str__(self):
-        return f'{super().__str__()} - Fecha de Fabricación: {self.fecha_fabricacion}'
-
-class ProductoAlimenticio(Producto):
-    def __init__(self, nombre, precio, stock, origen, fecha_vencimiento):
-        super().__init__(nombre, precio, stock, origen)        
-        self.__fecha_vencimiento = self.validar_fecha(fecha_vencimiento)
-        
+    def ajustar_stock(self, nombre_producto, cantidad):
+        self.operaciones.append(('ajustar_stock', nombre_producto, int(cantidad)))
     
-    @property
-    def fecha_vencimiento(self):
-        return self.__fecha_vencimiento.strftime('%Y-%m-%d') 
-       
-    @fecha_vencimiento.setter
-    def fecha_vencimiento(self, nueva_fecha):
-        self.__fecha_vencimiento = self.validar_fecha(nueva_fecha) 
-        
-    def validar_fecha(self, fecha):
-        try: 
-            fecha_vencimiento = datetime.strptime(fecha, '%Y-%m-%d')
-            return fecha_vencimiento.date()
-        except ValueError:
-            raise ValueError("Ingrese un formato de fecha correcto: aaaa-mm-dd")
-    
-    
-    def to_dict(self):
-        data = super().to_dict()
-        data['fecha_vencimiento'] = self.fecha_vencimiento 
-        return data
-        
-    def __str__(self):
-        return f'{super().__str__()} - Fecha de Vencimiento: {self.fecha_vencimiento}'
+    def eliminar(self, nombre_producto):
+        self.operaciones.append(('eliminar', nombre_producto))
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, tipo_error, error, traza):
+        if tipo_error is not None:
+            self.operaciones.clear()
+            return False
+        if self.operaciones:
+            try:
+                self.resumen = self.gestion._aplicar_transaccion(self.operaciones)
+            except Exception as error_aplicar:
+                print(f"Error al aplicar la transacción, no se guardó ningún cambio: {error_aplicar}")
+                raise
+            finally:
+                self.operaciones = []
+        return False
     
+class SeguimientoCambios:
+    # Consumidor del registro de cambios (ver GestionProductos.cambios_desde). Cada lectura
+    # repite las ultimas `margen` versiones para recoger las que se confirmaron despues de
+    # otras mayores, y descarta por version las que ya entrego: cada cambio se entrega una vez.
+    # Los cambios traen el estado actual del producto, asi que aplicarlos tarde es seguro.
+    def __init__(self, gestion, version=0, margen=None):
+        self.gestion = gestion
+        self.version = version
+        self.margen = gestion.backend.margen_cambios if margen is None else margen
+        self.__entregadas = set()
+    
+    def nuevos(self):
+        for cambio in self.gestion.cambios_desde(max(0, self.version - self.margen), excluir=self.__entregadas):
+            self.__entregadas.add(cambio['version'])
+            self.version = max(self.version, cambio['version'])
+            yield cambio
+        limite = self.version - self.margen
+        self.__entregadas = {version for version in self.__entregadas if version > limite}
+
 class GestionProductos:
-    def __init__(self):
-        self.host = config('DB_HOST')
-        self.database = config('DB_NAME')
-        self.user = config('DB_USER')
-        self.password = config('DB_PASSWORD')
-        self.port =config('DB_PORT')
+    # Atributos que dependen de la configuracion (.env / variables de entorno). No se leen al
+    # construir el objeto sino en el primer uso (ver _configurar), asi crear un GestionProductos
+    # no importa el driver ni lee el .env hasta que hace falta.
+    _CONFIGURABLES = frozenset({
+        'backend', 'esquema', 'replicas', 'leer_escrituras_propias', 'ventana_escritura',
+        'snapshot_ttl', 'cache', 'instrumentacion', 'busqueda', 'alertas',
+    })
+    
+    def __init__(self, usar_pool=None, backend=None, replicas=None):
+        # backend: 'mysql' o 'sqlite' (por defecto DB_MOTOR), o una instancia ya creada
+        # replicas: backends o endpoints de lectura (por defecto DB_REPLICAS)
+        self.__argumentos = (usar_pool, backend, replicas)
+        self.__configurada = False
+        self.__lock_configuracion = threading.RLock()
+        self.__ronda_replicas = None
+        self.__ultima_escritura = float('-inf')
+        self.__snapshot = None
+    
+    def __getattr__(self, nombre):
+        # solo se llama cuando el atributo todavia no existe
+        if nombre in self._CONFIGURABLES:
+            with self.__lock_configuracion:
+                if not self.__configurada:
+                    self._configurar()
+            if nombre in vars(self):
+                return vars(self)[nombre]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{nombre}'")
+    
+    def _configurar(self):
+        # Los atributos asignados a mano antes del primer uso (p. ej. gestion.esquema = ...)
+        # tienen prioridad sobre la configuracion
+        from decouple import config
         
-    def connect(self):
-        try:
-            connection = mysql.connector.connect(
-                host=self.host,
-                database= self.database,
-                user=self.user,
-                password=self.password,
-                port=self.port
-            )
+        self.__configurada = True
+        usar_pool, backend, replicas = self.__argumentos
+        if replicas is None:
+            replicas = [replica.strip() for replica in config('DB_REPLICAS', default='').split(',') if replica.strip()]
+        valores = {
+            'backend': lambda: backend if backend is not None and not isinstance(backend, str)
+                               else crear_backend(backend, usar_pool=usar_pool),
+            'esquema': lambda: validar_esquema(config('DB_ESQUEMA', default='normalizado')),
             
-            if connection.is_connected():
-                return connection
-        except Error as e:
+            # Replicas de lectura: las lecturas se reparten entre ellas y las escrituras van al
+            # primario. Con leer_escrituras_propias, durante ventana_escritura segundos despues
+            # de una escritura se lee del primario.
+            'replicas': lambda: crear_replicas(self.backend.motor, replicas, usar_pool=usar_pool),
+            'leer_escrituras_propias': lambda: config('DB_LEER_ESCRITURAS_PROPIAS', default=True, cast=bool),
+            'ventana_escritura': lambda: config('DB_REPLICA_RETRASO', default=1.0, cast=float),
+            
+            # Copia en memoria de leer_todos_productos, valida mientras no cambien la version maxima
+            # ni la cantidad de filas del registro de cambios y por como maximo snapshot_ttl
+            # segundos (0 la desactiva). Las escrituras de esta instancia la descartan en el acto.
+            # Limite: si otro proceso confirma tarde una version menor justo cuando se purga el
+            # registro, la cantidad puede no cambiar y la copia queda vieja hasta snapshot_ttl.
+            'snapshot_ttl': lambda: config('CACHE_SNAPSHOT_TTL', default=60, cast=float),
+            
+            'cache': lambda: CacheProductos(
+                tamano_maximo=config('CACHE_SIZE', default=1024, cast=int),
+                ttl=config('CACHE_TTL', default=60, cast=float)
+            ),
+            
+            # Tiempos por operacion y fase; se consultan con self.instrumentacion.registro.resumen()
+            'instrumentacion': crear_instrumentacion,
+            
+            # Indice de nombres para buscar_productos; se arma en la primera busqueda
+            'busqueda': lambda: BusquedaProductos(self),
+            
+            # Alertas de vencimiento y stock bajo; se cargan en la primera revision
+            'alertas': lambda: MonitorAlertas(self),
+        }
+        for nombre, crear in valores.items():
+            if nombre not in vars(self):
+                setattr(self, nombre, crear())
+        self.__ronda_replicas = cycle(self.replicas)
+        
+    def connect(self, lectura=False):
+        # lectura=True: la conexion puede ir a una replica
+        backend = self.backend
+        if not lectura:
+            # la copia de leer_todos_productos no debe sobrevivir a una escritura propia
+            self.__snapshot = None
+        if self.replicas:
+            if not lectura:
+                self.__ultima_escritura = time.monotonic()
+            elif not (self.leer_escrituras_propias and time.monotonic() - self.__ultima_escritura < self.ventana_escritura):
+                backend = next(self.__ronda_replicas)
+        if backend is not self.backend:
+            try:
+                return self._conectar(backend)
+            except self.backend.Error as e:
+                # se lee del primario sin contarlo como escritura propia
+                print(f"Replica no disponible, se lee del primario: {e}")
+        try:
+            return self._conectar(self.backend)
+        except self.backend.Error as e:
             print(f"error al conectar a la base de datos: {e}")
             return None
+    
+    def _conectar(self, backend):
+        if self.instrumentacion is None:
+            return backend.connect()
+        inicio = time.perf_counter_ns()
+        connection = backend.connect()
+        return self.instrumentacion.envolver(connection, inicio)
+    
+    def cerrar_conexion(self, connection):
+        # En conexiones del pool, close() devuelve la conexion al pool (aunque este caida)
+        if connection:
+            try:
+                connection.close()
+            except self.backend.Error as e:
+                print(f"Error al cerrar la conexion: {e}")
 
+    def crear_tablas(self):
+        connection = None
+        try:
+            connection = self.connect()
+            if connection:
+                self.backend.crear_esquema(connection, self.esquema)
+                return True
+        except self.backend.Error as e:
+            print(f"Error al crear las tablas: {e}")
+        finally:
+            self.cerrar_conexion(connection)
+        return False
+    
+    # Unidad de trabajo: with gestion.transaction() as tx: tx.crear(...); tx.eliminar(...)
+    def transaction(self):
+        return TransaccionProductos(self)
+    
+    @instrumentado
+    def _aplicar_transaccion(self, operaciones):
+        connection = self.connect()
+        if not connection:
+            raise ConnectionError("No se pudo conectar a la base de datos")
+        try:
+            resumen = {'creados': 0, 'actualizados': 0, 'eliminados': 0}
+            with connection.cursor() as cursor:
+                # operaciones consecutivas del mismo tipo se envian juntas
+                for tipo, grupo in groupby(operaciones, key=lambda operacion: operacion[0]):
+                    argumentos = [operacion[1:] for operacion in grupo]
+                    if tipo == 'crear':
+                        self._insertar_filas(cursor, [self._filas_producto(producto) for (producto,) in argumentos])
+                        resumen['creados'] += len(argumentos)
+                    elif tipo in ('precio', 'stock'):
+                        # de a una sentencia para saber si cada producto existe, como en ajustar_stock
+                        for nombre, valor in argumentos:
+                            cursor.execute(f'UPDATE productos SET {tipo} = %s WHERE nombre = %s', (valor, nombre))
+                            if cursor.rowcount == 0:
+                                raise ValueError(f"No se pudo actualizar el {tipo} del producto {nombre} (inexistente)")
+                        resumen['actualizados'] += len(argumentos)
+                    elif tipo == 'ajustar_stock':
+                        for nombre, cantidad in argumentos:
+                            if self.backend.ajustar_stock(cursor, nombre, cantidad) is None:
+                                raise ValueError(f"No se pudo ajustar el stock del producto {nombre}")
+                        resumen['actualizados'] += len(argumentos)
+                    elif tipo == 'eliminar':
+                        nombres = [nombre for (nombre,) in argumentos]
+                        marcadores = ', '.join(['%s'] * len(nombres))
+                        cursor.execute(f'DELETE FROM productos WHERE nombre IN ({marcadores})', nombres)
+                        # los nombres no distinguen mayusculas: 'Leche' y 'leche' son un solo producto
+                        if cursor.rowcount < len({nombre.lower() for nombre in nombres}):
+                            raise ValueError(f"No se pudieron eliminar los productos {', '.join(nombres)} (alguno inexistente)")
+                        resumen['eliminados'] += cursor.rowcount
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            self.cerrar_conexion(connection)
+        
+        for operacion in operaciones:
+            self.cache.invalidar(operacion[1].nombre if operacion[0] == 'crear' else operacion[1])
+        self.busqueda.pendiente = True
+        return resumen
            
-    @staticmethod
-    def serializar_fecha(obj):
-        if isinstance(obj, (date, datetime)):
-            return obj.isoformat()
-        raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+    serializar_fecha = staticmethod(serializar_fecha)
 
+    @instrumentado
     def crear_producto(self, producto):
         try:
             connection = self.connect()          
             if connection:
                 with connection.cursor() as cursor:
-                    # Verificar nombre
-                    cursor.execute('SELECT nombre FROM productos WHERE nombre = %s', (producto.nombre,))
-                    if cursor.fetchone():
+                    # El indice unico sobre Nombre rechaza duplicados, incluso entre sesiones concurrentes
+                    try:
+                        self._insertar_filas(cursor, [self._filas_producto(producto)])
+                    except self.backend.IntegrityError:
+                        connection.rollback()
                         print(f'Error: Ya existe el producto {producto.nombre}')
                         return
-                    
-                    query_productos = '''INSERT INTO productos(nombre, precio, stock, origen)
-                    VALUES(%s, %s, %s, %s)
-                    '''
-                    cursor.execute(query_productos, (producto.nombre, producto.precio, producto.stock, producto.origen))                    
-                    
-                    if isinstance(producto, ProductoAlimenticio):
-                        query_especifico = '''INSERT INTO productoalimenticio (nombre, fecha_vencimiento)
-                        VALUES (%s, %s)                         
-                        '''
-                        fecha_vencimiento = datetime.strptime(producto.fecha_vencimiento, '%Y-%m-%d').date()
-                        cursor.execute(query_especifico, (producto.nombre, fecha_vencimiento))
-                    elif isinstance(producto, ProductoElectronico):
-                        query_especifico = '''INSERT INTO productoelectronico (nombre, fecha_fabricacion)
-                        VALUES (%s, %s)                         
-                        '''
-                        fecha_fabricacion = datetime.strptime(producto.fecha_fabricacion, '%Y-%m-%d').date()
-                        cursor.execute(query_especifico, (producto.nombre, fecha_fabricacion))
 
                     connection.commit()
+                    self.cache.invalidar(producto.nombre)
+                    self.busqueda.pendiente = True
                     print(f"El producto ({producto.nombre}) fue creado correctamente")
         except Exception as error:
             print(f'Error inesperado al crear producto: {error}')
             traceback.print_exc()  # traceback 
         finally:
-            if connection and connection.is_connected():
-                connection.close()
+            self.cerrar_conexion(connection)
     
-    def leer_producto(self, nombre):
+    @staticmethod
+    def _filas_producto(producto):
+        # Devuelve la fila comun de productos, el tipo y la fecha propia del subtipo
+        fila = (producto.nombre, producto.precio, producto.stock, producto.origen)
+        if isinstance(producto, ProductoAlimenticio):
+            return fila, 'alimenticio', producto.fecha_vencimiento
+        if isinstance(producto, ProductoElectronico):
+            return fila, 'electronico', producto.fecha_fabricacion
+        return fila, 'producto', None
+    
+    def _insertar_filas(self, cursor, filas):
+        if self.esquema == 'tabla_unica':
+            query = '''INSERT INTO productos(Nombre, Precio, Stock, Origen, tipo, fecha_vencimiento, fecha_fabricacion)
+            VALUES(%s, %s, %s, %s, %s, %s, %s)
+            '''
+            cursor.executemany(query, [
+                fila + (tipo, fecha if tipo == 'alimenticio' else None, fecha if tipo == 'electronico' else None)
+                for fila, tipo, fecha in filas
+            ])
+            return
+        
+        query_productos = '''INSERT INTO productos(Nombre, Precio, Stock, Origen)
+        VALUES(%s, %s, %s, %s)
+        '''
+        cursor.executemany(query_productos, [fila for fila, _, _ in filas])
+        
+        # Las subtablas se enlazan por id: se recuperan los ids recien generados en una consulta
+        con_subtipo = [(fila[0], tipo, fecha) for fila, tipo, fecha in filas if fecha is not None]
+        if not con_subtipo:
+            return
+        marcadores = ', '.join(['%s'] * len(con_subtipo))
+        cursor.execute(f'SELECT id, Nombre FROM productos WHERE Nombre IN ({marcadores})', [nombre for nombre, _, _ in con_subtipo])
+        ids = {nombre.lower(): id_producto for id_producto, nombre in cursor.fetchall()}
+        
+        queries_especificas = {
+            'alimenticio': 'INSERT INTO productoalimenticio (producto_id, fecha_vencimiento) VALUES (%s, %s)',
+            'electronico': 'INSERT INTO productoelectronico (producto_id, fecha_fabricacion) VALUES (%s, %s)',
+        }
+        for tipo_tabla, query in queries_especificas.items():
+            filas_tabla = [(ids[nombre.lower()], fecha) for nombre, tipo, fecha in con_subtipo if tipo == tipo_tabla]
+            if filas_tabla:
+                cursor.executemany(query, filas_tabla)
+
+    # Inserta productos en lotes. Devuelve un resumen por lote con la cantidad de insertados y
+    # omitidos (ya existentes o repetidos) y los fallidos (nombre, error). Con nombres=True el
+    # resumen trae ademas los nombres insertados y omitidos; sin eso la memoria no crece con el
+    # tamaño de la importacion.
+    @instrumentado
+    def crear_productos(self, productos, tamano_lote=1000, nombres=False):
+        resumen = []
+        connection = None
         try:
             connection = self.connect()
+            if not connection:
+                return resumen
+            
+            iterador = iter(productos)
+            while True:
+                lote = list(islice(iterador, tamano_lote))
+                if not lote:
+                    break
+                insertados, omitidos, fallidos = [], [], []
+                
+                with connection.cursor() as cursor:
+                    # Verificar nombres existentes del lote en una sola consulta; los de lotes
+                    # anteriores ya estan confirmados y tambien aparecen aca
+                    nombres_lote = [producto.nombre for producto in lote]
+                    marcadores = ', '.join(['%s'] * len(nombres_lote))
+                    cursor.execute(f'SELECT nombre FROM productos WHERE nombre IN ({marcadores})', nombres_lote)
+                    existentes = {fila[0].capitalize() for fila in cursor.fetchall()}
+                    
+                    filas = []
+                    for producto in lote:
+                        if producto.nombre in existentes:
+                            omitidos.append(producto.nombre)
+                            continue
+                        # repetido dentro del mismo lote
+                        existentes.add(producto.nombre)
+                        filas.append(self._filas_producto(producto))
+                    
+                    try:
+                        if filas:
+                            self._insertar_filas(cursor, filas)
+                        connection.commit()
+                        insertados = [fila[0] for fila, _, _ in filas]
+                        for nombre in insertados:
+                            self.cache.invalidar(nombre)
+                        self.busqueda.pendiente = True
+                    except self.backend.Error as error:
+                        # Reintentar fila por fila para aislar las que fallan
+                        connection.rollback()
+                        print(f'Error en el lote, reintentando por producto: {error}')
+                        for fila in filas:
+                            try:
+                                self._insertar_filas(cursor, [fila])
+                                connection.commit()
+                                self.cache.invalidar(fila[0][0])
+                                self.busqueda.pendiente = True
+                                insertados.append(fila[0][0])
+                            except self.backend.IntegrityError:
+                                # creado por otra sesion despues de la verificacion del lote
+                                connection.rollback()
+                                omitidos.append(fila[0][0])
+                            except self.backend.Error as error_fila:
+                                connection.rollback()
+                                fallidos.append((fila[0][0], str(error_fila)))
+                
+                resultado = {'insertados': len(insertados), 'omitidos': len(omitidos), 'fallidos': fallidos}
+                if nombres:
+                    resultado['nombres_insertados'] = insertados
+                    resultado['nombres_omitidos'] = omitidos
+                resumen.append(resultado)
+                print(f"Lote {len(resumen)}: {len(insertados)} insertados, "
+                      f"{len(omitidos)} omitidos, {len(fallidos)} fallidos")
+        except Exception as error:
+            print(f'Error inesperado al crear productos: {error}')
+            traceback.print_exc()
+        finally:
+            self.cerrar_conexion(connection)
+        return resumen
+    
+    @instrumentado
+    def leer_producto(self, nombre):
+        producto = self.cache.obtener(nombre)
+        if producto:
+            return producto
+        
+        connection = None
+        try:
+            connection = self.connect(lectura=True)
             if connection:
                 with connection.cursor(dictionary=True) as cursor:
-                    query = """
-                    SELECT p.*, pa.fecha_vencimiento, pe.fecha_fabricacion
-                    FROM Productos p
-                    LEFT JOIN productoAlimenticio pa ON p.Nombre = pa.Nombre
-                    LEFT JOIN productoElectronico pe ON p.Nombre = pe.Nombre
-                    WHERE p.Nombre = %s
-                    """
+                    query = SELECT_PRODUCTOS[self.esquema] + "WHERE p.Nombre = %s"
                     cursor.execute(query, (nombre,))
                     producto = cursor.fetchone()
 
                     if producto:
+                        self.cache.guardar(nombre, producto)
                         return producto
                     else:
                         print(f"No se encontró el producto {nombre}")
@@ -233,10 +496,56 @@ class GestionProductos:
             print(f'Error inesperado al leer producto: {error}')
             traceback.print_exc()
         finally:
-            if connection and connection.is_connected():
-                connection.close()
+            self.cerrar_conexion(connection)
         return None
 
+    # Resuelve varios nombres a la vez: primero en la cache y el resto con una consulta
+    # WHERE Nombre IN (...) por lote. Devuelve ({nombre: fila}, [nombres no encontrados]).
+    @instrumentado
+    def leer_productos(self, nombres, tamano_lote=500):
+        encontrados = {}
+        pendientes = {}     # nombre en minusculas -> todas las grafias pedidas
+        for nombre in nombres:
+            if nombre in encontrados:
+                continue
+            grafias = pendientes.get(nombre.lower())
+            if grafias is not None:
+                if nombre not in grafias:
+                    grafias.append(nombre)
+                continue
+            producto = self.cache.obtener(nombre)
+            if producto:
+                encontrados[nombre] = producto
+            else:
+                pendientes[nombre.lower()] = [nombre]
+        
+        connection = None
+        try:
+            if pendientes:
+                connection = self.connect(lectura=True)
+            if connection:
+                claves = list(pendientes)
+                with connection.cursor(dictionary=True) as cursor:
+                    for inicio in range(0, len(claves), tamano_lote):
+                        lote = [pendientes[clave][0] for clave in claves[inicio:inicio + tamano_lote]]
+                        marcadores = ', '.join(['%s'] * len(lote))
+                        cursor.execute(SELECT_PRODUCTOS[self.esquema] + f"WHERE p.Nombre IN ({marcadores})", lote)
+                        for producto in cursor.fetchall():
+                            grafias = pendientes.pop(producto['Nombre'].lower(), None)
+                            if grafias is not None:
+                                self.cache.guardar(grafias[0], producto)
+                                for nombre in grafias:
+                                    encontrados[nombre] = producto
+        except Exception as error:
+            print(f'Error inesperado al leer productos: {error}')
+            traceback.print_exc()
+        finally:
+            self.cerrar_conexion(connection)
+        
+        # lo que queda en pendientes no existe en la base (en el orden pedido)
+        return encontrados, [nombre for grafias in pendientes.values() for nombre in grafias]
+
+    @instrumentado
     def actualizar_precio_producto(self, nombre_producto, nuevo_precio):
         try:
             connection = self.connect()
@@ -246,6 +555,7 @@ class GestionProductos:
                     
                     if cursor.rowcount > 0:
                         connection.commit()
+                        self.cache.invalidar(nombre_producto)
                         print(f"El precio se actualizó correctamente para el producto {nombre_producto}")
                         return True
                     else:
@@ -256,9 +566,9 @@ class GestionProductos:
             print(f"Error al actualizar el precio del producto: {e}")
             return False
         finally:
-            if connection and connection.is_connected():
-                connection.close()
+            self.cerrar_conexion(connection)
 
+    @instrumentado
     def actualizar_stock_producto(self, nombre_producto, nuevo_stock):
         try:
             connection = self.connect()
@@ -268,6 +578,7 @@ class GestionProductos:
                     
                     if cursor.rowcount > 0:
                         connection.commit()
+                        self.cache.invalidar(nombre_producto)
                         print(f"El stock se actualizó correctamente para el producto {nombre_producto}")
                         return True
                     else:
@@ -278,62 +589,299 @@ class GestionProductos:
             print(f"Error al actualizar el stock del producto: {e}")
             return False
         finally:
-            if connection and connection.is_connected():
-                connection.close() 
+            self.cerrar_conexion(connection)
       
-    def eliminar_producto(self, nombre_producto):
+    # Suma (o resta) una cantidad al stock en el servidor, sin dejarlo negativo,
+    # y devuelve el nuevo valor en la misma consulta.
+    @instrumentado
+    def ajustar_stock_producto(self, nombre_producto, cantidad):
+        connection = None
         try:
             connection = self.connect()
             if connection:
                 with connection.cursor() as cursor:
-                    cursor.execute("SELECT * FROM productos WHERE nombre = %s", (nombre_producto,))
-                    if not cursor.fetchone():
-                        print(f"No se encontró el producto {nombre_producto}")
-                        return False
-
-                    # eliminar tablas relacionadas
-                    cursor.execute("DELETE FROM productoelectronico WHERE nombre = %s", (nombre_producto,))
-                    cursor.execute("DELETE FROM productoalimenticio WHERE nombre = %s", (nombre_producto,))
+                    nuevo_stock = self.backend.ajustar_stock(cursor, nombre_producto, cantidad)
                     
-                    # tabla principal
+                    if nuevo_stock is not None:
+                        connection.commit()
+                        self.cache.invalidar(nombre_producto)
+                        print(f"El stock se actualizó correctamente para el producto {nombre_producto}")
+                        return nuevo_stock
+                    else:
+                        print(f"No se pudo ajustar el stock del producto {nombre_producto} (inexistente o stock insuficiente)")
+                        return None
+        
+        except Exception as e:
+            print(f"Error al ajustar el stock del producto: {e}")
+            return None
+        finally:
+            self.cerrar_conexion(connection)
+    
+    # Aplica varios ajustes {nombre: cantidad} en una sola transaccion: se aplican todos o ninguno
+    @instrumentado
+    def ajustar_stock_productos(self, ajustes):
+        connection = None
+        try:
+            connection = self.connect()
+            if connection:
+                nuevos_stocks = {}
+                with connection.cursor() as cursor:
+                    for nombre_producto, cantidad in ajustes.items():
+                        nuevo_stock = self.backend.ajustar_stock(cursor, nombre_producto, cantidad)
+                        if nuevo_stock is None:
+                            connection.rollback()
+                            print(f"No se pudo ajustar el stock del producto {nombre_producto}, no se aplicó ningún ajuste")
+                            return None
+                        nuevos_stocks[nombre_producto] = nuevo_stock
+                    
+                    connection.commit()
+                    for nombre_producto in nuevos_stocks:
+                        self.cache.invalidar(nombre_producto)
+                    return nuevos_stocks
+        
+        except Exception as e:
+            print(f"Error al ajustar el stock de los productos: {e}")
+            if connection:
+                connection.rollback()
+            return None
+        finally:
+            self.cerrar_conexion(connection)
+    
+    # Modifica el precio por porcentaje en el servidor y devuelve el nuevo precio
+    @instrumentado
+    def ajustar_precio_producto(self, nombre_producto, porcentaje):
+        connection = None
+        try:
+            connection = self.connect()
+            if connection:
+                with connection.cursor() as cursor:
+                    nuevo_precio = self.backend.ajustar_precio(cursor, nombre_producto, porcentaje)
+                    
+                    if nuevo_precio is not None:
+                        connection.commit()
+                        self.cache.invalidar(nombre_producto)
+                        print(f"El precio se actualizó correctamente para el producto {nombre_producto}")
+                        return nuevo_precio
+                    else:
+                        print(f"No se pudo ajustar el precio del producto {nombre_producto}")
+                        return None
+        
+        except Exception as e:
+            print(f"Error al ajustar el precio del producto: {e}")
+            return None
+        finally:
+            self.cerrar_conexion(connection)
+      
+    @instrumentado
+    def eliminar_producto(self, nombre_producto):
+        try:
+            connection = self.connect()
+            if connection:
+                with connection.cursor() as cursor:
+                    # las subtablas se eliminan en cascada (ON DELETE CASCADE)
                     cursor.execute("DELETE FROM productos WHERE nombre = %s", (nombre_producto,))
                     
                     if cursor.rowcount > 0:
                         connection.commit()
+                        self.cache.invalidar(nombre_producto)
+                        self.busqueda.pendiente = True
                         return True
                     else:
-                        print(f"No se pudo eliminar el producto {nombre_producto}")
+                        print(f"No se encontró el producto {nombre_producto}")
                         return False
-        except mysql.connector.Error as e:
+        except self.backend.Error as e:
             print(f"Error al eliminar el producto: {e}")
             return False
         finally:
-            if connection and connection.is_connected():
-                connection.close()
+            self.cerrar_conexion(connection)
 
 
+    # Busqueda por nombre parcial. modo: 'prefijo', 'subcadena' o 'aproximado' (tolera errores de tipeo).
+    # Devuelve (productos de la pagina, total de coincidencias), ordenados por relevancia.
+    @instrumentado
+    def buscar_productos(self, texto, modo='subcadena', pagina=1, tamano_pagina=20):
+        return self.busqueda.buscar(texto, modo, pagina, tamano_pagina)
+    
+    @instrumentado
     def leer_todos_productos(self):
+        connection = None
         try:
-            connection = self.connect()
+            connection = self.connect(lectura=True)
             if connection:
                 with connection.cursor(dictionary=True) as cursor:
-                    query = """
-                    SELECT p.*, pa.fecha_vencimiento, pe.fecha_fabricacion
-                    FROM Productos p
-                    LEFT JOIN productoAlimenticio pa ON p.Nombre = pa.Nombre
-                    LEFT JOIN productoElectronico pe ON p.Nombre = pe.Nombre
-                    """
+                    version = None
+                    if self.snapshot_ttl > 0:
+                        # las versiones se asignan al escribir: una escritura que confirma tarde
+                        # no sube MAX(version) pero si la cantidad de filas
+                        cursor.execute('SELECT MAX(version) AS version, COUNT(*) AS cantidad FROM productos_cambios')
+                        fila = cursor.fetchone()
+                        version = (fila['version'], fila['cantidad'])
+                        snapshot = self.__snapshot
+                        if snapshot and snapshot[0] == version and time.monotonic() - snapshot[1] < self.snapshot_ttl:
+                            # copias de las filas, como CacheProductos: el que llama puede modificarlas
+                            return [dict(fila) for fila in snapshot[2]]
+                    
+                    query = SELECT_PRODUCTOS[self.esquema]
                     cursor.execute(query)
                     productos = cursor.fetchall()
+                    if self.snapshot_ttl > 0:
+                        self.__snapshot = (version, time.monotonic(), productos)
+                        return [dict(fila) for fila in productos]
+                    return productos
+        except Exception as error:
+            print(f'Error inesperado al leer productos: {error}')
+            traceback.print_exc()
+        finally:
+            self.cerrar_conexion(connection)
+        return []
 
-                    if productos:
-                        return productos
-                    else:
-                        return []
+    # Productos alimenticios con vencimiento entre desde (excluido) y hasta (incluido),
+    # ordenados por fecha: usa el indice de fecha_vencimiento en lugar de recorrer el catalogo
+    @instrumentado
+    def leer_productos_por_vencer(self, desde, hasta):
+        connection = None
+        try:
+            connection = self.connect(lectura=True)
+            if connection:
+                with connection.cursor(dictionary=True) as cursor:
+                    columna = VENCIMIENTO[self.esquema]
+                    query = SELECT_PRODUCTOS[self.esquema] + f"WHERE {columna} > %s AND {columna} <= %s ORDER BY {columna}"
+                    cursor.execute(query, (desde, hasta))
+                    return cursor.fetchall()
+        except Exception as error:
+            print(f'Error inesperado al leer productos por vencer: {error}')
+            traceback.print_exc()
+        finally:
+            self.cerrar_conexion(connection)
+        return []
+    
+    # Productos con stock menor al umbral (indice ix_productos_stock)
+    @instrumentado
+    def leer_productos_stock_bajo(self, umbral):
+        connection = None
+        try:
+            connection = self.connect(lectura=True)
+            if connection:
+                with connection.cursor(dictionary=True) as cursor:
+                    cursor.execute(SELECT_PRODUCTOS[self.esquema] + "WHERE p.Stock < %s ORDER BY p.Stock", (umbral,))
+                    return cursor.fetchall()
+        except Exception as error:
+            print(f'Error inesperado al leer productos con stock bajo: {error}')
+            traceback.print_exc()
+        finally:
+            self.cerrar_conexion(connection)
+        return []
+    
+    # Alertas nuevas desde la revision anterior (ver alertas.MonitorAlertas.revisar)
+    @instrumentado
+    def revisar_alertas(self, hoy=None):
+        return self.alertas.revisar(hoy)
+
+    # Recorre el catalogo por paginas ordenadas por Nombre (paginacion por clave),
+    # sin cargar todos los productos en memoria. Cada pagina usa su propia conexion.
+    def iterar_productos(self, tamano_pagina=500):
+        ultimo_nombre = ''
+        while True:
+            pagina = self._leer_pagina_productos(ultimo_nombre, tamano_pagina)
+            yield from pagina
+            if len(pagina) < tamano_pagina:
+                return
+            ultimo_nombre = pagina[-1]['Nombre']
+    
+    @instrumentado
+    def _leer_pagina_productos(self, ultimo_nombre, tamano_pagina):
+        connection = None
+        try:
+            connection = self.connect(lectura=True)
+            if connection:
+                with connection.cursor(dictionary=True) as cursor:
+                    query = SELECT_PRODUCTOS[self.esquema] + "WHERE p.Nombre > %s ORDER BY p.Nombre LIMIT %s"
+                    cursor.execute(query, (ultimo_nombre, tamano_pagina))
+                    return cursor.fetchall()
         except Exception as error:
             print(f'Error inesperado al leer productos: {error}')
             traceback.print_exc()
         finally:
-            if connection and connection.is_connected():
-                connection.close()
+            self.cerrar_conexion(connection)
         return []
+    
+    # Sincronizacion incremental: devuelve los cambios con version > `version` en orden, cada uno
+    # con el estado actual del producto (None si ya no existe). El consumidor guarda la ultima
+    # version procesada y vuelve a llamar desde ahi; el costo es proporcional a los cambios.
+    # En MySQL las versiones se asignan al escribir y no al confirmar: una transaccion larga
+    # puede confirmar una version menor a otra ya leida. seguir_cambios resuelve eso releyendo
+    # con un margen; `excluir` son versiones ya aplicadas, que se descartan sin leer el producto.
+    def cambios_desde(self, version=0, tamano_pagina=500, excluir=()):
+        while True:
+            pagina, leidos, version = self._leer_pagina_cambios(version, tamano_pagina, excluir)
+            yield from pagina
+            if leidos < tamano_pagina:
+                return
+    
+    def seguir_cambios(self, version=0, margen=None):
+        return SeguimientoCambios(self, version, margen)
+    
+    @instrumentado
+    def _leer_pagina_cambios(self, version, tamano_pagina, excluir=()):
+        # Devuelve (cambios, cantidad de filas leidas del registro, ultima version leida)
+        connection = None
+        try:
+            connection = self.connect(lectura=True)
+            if connection:
+                with connection.cursor(dictionary=True) as cursor:
+                    cursor.execute(
+                        'SELECT version, producto_id, Nombre, operacion FROM productos_cambios '
+                        'WHERE version > %s ORDER BY version LIMIT %s',
+                        (version, tamano_pagina)
+                    )
+                    leidos = cursor.fetchall()
+                    cambios = [cambio for cambio in leidos if cambio['version'] not in excluir]
+                    ids = list({cambio['producto_id'] for cambio in cambios if cambio['operacion'] != 'baja'})
+                    actuales = {}
+                    if ids:
+                        marcadores = ', '.join(['%s'] * len(ids))
+                        cursor.execute(SELECT_PRODUCTOS[self.esquema] + f"WHERE p.id IN ({marcadores})", ids)
+                        actuales = {fila['id']: fila for fila in cursor.fetchall()}
+                    cambios = [{'version': cambio['version'], 'operacion': cambio['operacion'], 'Nombre': cambio['Nombre'],
+                                'producto': actuales.get(cambio['producto_id'])} for cambio in cambios]
+                    return cambios, len(leidos), leidos[-1]['version'] if leidos else version
+        except Exception as error:
+            print(f'Error inesperado al leer los cambios: {error}')
+            traceback.print_exc()
+        finally:
+            self.cerrar_conexion(connection)
+        return [], 0, version
+    
+    # Version del ultimo cambio registrado: punto de partida para un consumidor que
+    # hace una carga completa con iterar_productos y luego sigue con cambios_desde.
+    @instrumentado
+    def version_cambios(self):
+        connection = None
+        try:
+            connection = self.connect(lectura=True)
+            if connection:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT MAX(version) FROM productos_cambios')
+                    return cursor.fetchone()[0] or 0
+        except self.backend.Error as error:
+            print(f'Error al leer la version de cambios: {error}')
+        finally:
+            self.cerrar_conexion(connection)
+        return None
+    
+    # Borra del registro los cambios ya procesados por todos los consumidores
+    @instrumentado
+    def purgar_cambios(self, hasta_version):
+        connection = None
+        try:
+            connection = self.connect()
+            if connection:
+                with connection.cursor() as cursor:
+                    cursor.execute('DELETE FROM productos_cambios WHERE version <= %s', (hasta_version,))
+                    connection.commit()
+                    return cursor.rowcount
+        except self.backend.Error as error:
+            print(f'Error al purgar el registro de cambios: {error}')
+        finally:
+            self.cerrar_conexion(connection)
+        return 0
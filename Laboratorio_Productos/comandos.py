@@ -0,0 +1,243 @@
+""" Modo no interactivo de main.py: subcomandos con salida en JSON.
+
+    python main.py add alimenticio Leche 1500 20 Argentina 2025-12-01
+    python main.py get Leche Yogur
+    python main.py update-price Leche 10 --porcentaje
+    python main.py update-stock Leche -3 --relativo
+    python main.py delete Leche
+    python main.py list
+    python main.py import productos.ndjson --procesos 4
+    python main.py export catalogo.csv
+    python main.py alerts --cada 60         (vencimientos proximos y stock bajo; solo las nuevas)
+    python main.py batch comandos.txt        (o "-" para leer de stdin)
+
+Cada comando escribe una linea JSON por resultado en stdout (los mensajes de GestionProductos
+van a stderr). En batch todos los comandos usan la misma sesion de GestionProductos y los add y
+get consecutivos se agrupan en una sola llamada a crear_productos / leer_productos.
+El codigo de salida es 1 si algun comando fallo.
+ """
+
+import argparse
+import contextlib
+import json
+import shlex
+import sys
+import time
+
+from clases import GestionProductos, Producto, ProductoAlimenticio, ProductoElectronico
+
+TIPOS = {'electronico': ProductoElectronico, 'alimenticio': ProductoAlimenticio}
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog='main.py', description="Gestión de productos sin menú interactivo")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    add = subcomandos.add_parser('add', help="agregar un producto")
+    add.add_argument('tipo', choices=list(TIPOS))
+    add.add_argument('nombre')
+    add.add_argument('precio')
+    add.add_argument('stock')
+    add.add_argument('origen')
+    add.add_argument('fecha', help="fabricación (electronico) o vencimiento (alimenticio): aaaa-mm-dd o dd-mm-aaaa")
+
+    get = subcomandos.add_parser('get', help="mostrar uno o más productos")
+    get.add_argument('nombres', nargs='+')
+
+    precio = subcomandos.add_parser('update-price', help="cambiar el precio")
+    precio.add_argument('nombre')
+    precio.add_argument('valor', type=float)
+    precio.add_argument('--porcentaje', action='store_true', help="el valor es un porcentaje de cambio")
+
+    stock = subcomandos.add_parser('update-stock', help="cambiar el stock")
+    stock.add_argument('nombre')
+    stock.add_argument('valor', type=int)
+    stock.add_argument('--relativo', action='store_true', help="sumar el valor (negativo para restar)")
+
+    delete = subcomandos.add_parser('delete', help="eliminar un producto")
+    delete.add_argument('nombre')
+
+    subcomandos.add_parser('list', help="listar todos los productos (una línea por producto)")
+
+    importar = subcomandos.add_parser('import', help="importar un archivo .json, .ndjson o .csv")
+    importar.add_argument('ruta')
+    importar.add_argument('--lote', type=int, default=1000)
+    importar.add_argument('--procesos', type=int, default=1)
+
+    exportar = subcomandos.add_parser('export', help="exportar el catálogo a .json, .ndjson o .csv")
+    exportar.add_argument('ruta')
+
+    alertas = subcomandos.add_parser('alerts', help="alertas de vencimiento y stock bajo")
+    alertas.add_argument('--cada', type=float, default=0,
+                         help="repetir la revisión cada tantos segundos, informando solo las alertas nuevas")
+
+    batch = subcomandos.add_parser('batch', help="ejecutar comandos de un archivo, uno por línea")
+    batch.add_argument('archivo', nargs='?', default='-')
+    return parser
+
+class Comandos:
+    def __init__(self, gestion, salida):
+        self.gestion = gestion
+        self.salida = salida
+        self.fallidos = 0
+
+    def emitir(self, resultado):
+        if not resultado.get('ok', True):
+            self.fallidos += 1
+        self.salida.write(json.dumps(resultado, default=GestionProductos.serializar_fecha, ensure_ascii=False) + '\n')
+
+    def ejecutar(self, argumentos):
+        # argumentos: lista de Namespace del mismo comando (add y get se agrupan)
+        getattr(self, f"_{argumentos[0].comando.replace('-', '_')}")(argumentos)
+
+    def _add(self, argumentos):
+        productos = []
+        for args in argumentos:
+            try:
+                productos.append(TIPOS[args.tipo](args.nombre, args.precio, args.stock, args.origen, args.fecha))
+            except ValueError as error:
+                productos.append(error)
+
+        estados = {}
+        for lote in self.gestion.crear_productos([p for p in productos if isinstance(p, Producto)], nombres=True):
+            # un nombre repetido en el mismo grupo aparece como insertado y como omitido
+            for nombre in lote['nombres_omitidos']:
+                estados.setdefault(nombre, "ya existe")
+            estados.update(lote['fallidos'])
+            estados.update((nombre, None) for nombre in lote['nombres_insertados'])
+
+        creados = set()
+        for args, producto in zip(argumentos, productos):
+            if isinstance(producto, ValueError):
+                error = str(producto)
+            elif producto.nombre in creados:
+                error = "ya existe"
+            else:
+                error = estados.get(producto.nombre, "no se pudo crear")
+                if error is None:
+                    creados.add(producto.nombre)
+            self.emitir({'comando': 'add', 'nombre': args.nombre, 'ok': error is None,
+                         **({'error': error} if error else {})})
+
+    def _get(self, argumentos):
+        nombres = [nombre for args in argumentos for nombre in args.nombres]
+        encontrados, _ = self.gestion.leer_productos(nombres)
+        for nombre in nombres:
+            producto = encontrados.get(nombre)
+            if producto:
+                self.emitir({'comando': 'get', 'nombre': nombre, 'ok': True, 'producto': producto})
+            else:
+                self.emitir({'comando': 'get', 'nombre': nombre, 'ok': False, 'error': "no encontrado"})
+
+    def _update_price(self, argumentos):
+        for args in argumentos:
+            if args.porcentaje:
+                precio = self.gestion.ajustar_precio_producto(args.nombre, args.valor)
+            else:
+                try:
+                    precio = Producto.validar_precio(args.valor)
+                except ValueError as error:
+                    self.emitir({'comando': 'update-price', 'nombre': args.nombre, 'ok': False, 'error': str(error)})
+                    continue
+                if not self.gestion.actualizar_precio_producto(args.nombre, precio):
+                    precio = None
+            self._emitir_actualizacion('update-price', args.nombre, 'precio', precio)
+
+    def _update_stock(self, argumentos):
+        for args in argumentos:
+            if args.relativo:
+                stock = self.gestion.ajustar_stock_producto(args.nombre, args.valor)
+            else:
+                try:
+                    stock = Producto.validar_stock(args.valor)
+                except ValueError as error:
+                    self.emitir({'comando': 'update-stock', 'nombre': args.nombre, 'ok': False, 'error': str(error)})
+                    continue
+                if not self.gestion.actualizar_stock_producto(args.nombre, stock):
+                    stock = None
+            self._emitir_actualizacion('update-stock', args.nombre, 'stock', stock)
+
+    def _emitir_actualizacion(self, comando, nombre, campo, valor):
+        if valor is None:
+            self.emitir({'comando': comando, 'nombre': nombre, 'ok': False,
+                         'error': "no encontrado o valor resultante inválido"})
+        else:
+            self.emitir({'comando': comando, 'nombre': nombre, 'ok': True, campo: valor})
+
+    def _delete(self, argumentos):
+        for args in argumentos:
+            ok = self.gestion.eliminar_producto(args.nombre)
+            self.emitir({'comando': 'delete', 'nombre': args.nombre, 'ok': ok, **({} if ok else {'error': "no encontrado"})})
+
+    def _list(self, argumentos):
+        for _ in argumentos:
+            for producto in self.gestion.iterar_productos(tamano_pagina=5000):
+                self.emitir(producto)
+
+    def _import(self, argumentos):
+        from importacion import importar_productos
+        for args in argumentos:
+            resultado = importar_productos(self.gestion, args.ruta, tamano_lote=args.lote, procesos=args.procesos)
+            ok = resultado['completa'] and not resultado['fallidos'] and not resultado['invalidos']
+            self.emitir({'comando': 'import', 'ruta': args.ruta, 'ok': ok, **resultado})
+
+    def _export(self, argumentos):
+        from importacion import exportar_productos
+        for args in argumentos:
+            self.emitir({'comando': 'export', 'ruta': args.ruta, 'ok': True, **exportar_productos(self.gestion, args.ruta)})
+
+    def _alerts(self, argumentos):
+        for args in argumentos:
+            while True:
+                for alerta in self.gestion.revisar_alertas():
+                    self.emitir({'comando': 'alerts', **alerta})
+                self.salida.flush()
+                if not args.cada:
+                    break
+                time.sleep(args.cada)
+
+    def _batch(self, argumentos):
+        for args in argumentos:
+            archivo = sys.stdin if args.archivo == '-' else open(args.archivo, encoding='utf-8')
+            try:
+                self.ejecutar_lineas(archivo)
+            finally:
+                if archivo is not sys.stdin:
+                    archivo.close()
+
+    def ejecutar_lineas(self, lineas, tamano_grupo=1000):
+        parser = crear_parser()
+        grupo = []
+        for numero, linea in enumerate(lineas, start=1):
+            linea = linea.strip()
+            if not linea or linea.startswith('#'):
+                continue
+            try:
+                args = parser.parse_args(shlex.split(linea))
+                if args.comando == 'batch':
+                    raise ValueError("batch no se puede anidar")
+            except (SystemExit, ValueError) as error:
+                self._ejecutar_grupo(grupo)
+                grupo = []
+                self.emitir({'comando': linea.split()[0], 'linea': numero, 'ok': False,
+                             'error': str(error) if isinstance(error, ValueError) else "argumentos inválidos"})
+                continue
+            # se acumulan los add / get consecutivos y se envian juntos
+            if grupo and (args.comando != grupo[0].comando or args.comando not in ('add', 'get') or len(grupo) >= tamano_grupo):
+                self._ejecutar_grupo(grupo)
+                grupo = []
+            grupo.append(args)
+        self._ejecutar_grupo(grupo)
+
+    def _ejecutar_grupo(self, grupo):
+        if grupo:
+            self.ejecutar(grupo)
+
+def main(argv):
+    args = crear_parser().parse_args(argv)
+    salida = sys.stdout
+    # los metodos de GestionProductos informan con print: se mandan a stderr para que
+    # stdout tenga solo el JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        comandos = Comandos(GestionProductos(), salida)
+        comandos.ejecutar([args])
+    return 1 if comandos.fallidos else 0
@@ -0,0 +1,269 @@
+""" Creación y migración del esquema de la base de datos de productos.
+
+Se admiten dos diseños:
+- normalizado: tabla productos con clave sustituta (id) y tablas productoalimenticio /
+  productoelectronico que referencian productos.id (ON DELETE CASCADE).
+- tabla_unica: toda la jerarquía en la tabla productos, con la columna tipo como discriminador.
+
+Cada diseño tiene su version para MySQL (TABLAS) y para SQLite (TABLAS_SQLITE).
+
+Ambos diseños incluyen el registro de cambios productos_cambios: triggers sobre productos
+anotan cada alta, modificacion y baja con una version creciente, que GestionProductos.cambios_desde
+usa para la sincronizacion incremental.
+
+Las alertas (alertas.py) consultan por rango de fecha_vencimiento y por Stock con sus indices.
+En una base MySQL creada antes de ix_productos_stock hay que agregarlo a mano:
+ALTER TABLE productos ADD INDEX ix_productos_stock (Stock)
+ """
+
+ESQUEMAS = ('normalizado', 'tabla_unica')
+
+# Registro de cambios, comun a los dos diseños. Los triggers cubren todas las escrituras
+# (GestionProductos, lotes, transacciones, la version async y SQL manual).
+CAMBIOS = [
+    """
+    CREATE TABLE IF NOT EXISTS productos_cambios (
+        version BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+        producto_id INT UNSIGNED NOT NULL,
+        Nombre VARCHAR(100) NOT NULL,
+        operacion ENUM('alta', 'modificacion', 'baja') NOT NULL,
+        fecha TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+        PRIMARY KEY (version)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tr_productos_alta AFTER INSERT ON productos FOR EACH ROW
+        INSERT INTO productos_cambios (producto_id, Nombre, operacion) VALUES (NEW.id, NEW.Nombre, 'alta')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tr_productos_modificacion AFTER UPDATE ON productos FOR EACH ROW
+        INSERT INTO productos_cambios (producto_id, Nombre, operacion) VALUES (NEW.id, NEW.Nombre, 'modificacion')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tr_productos_baja AFTER DELETE ON productos FOR EACH ROW
+        INSERT INTO productos_cambios (producto_id, Nombre, operacion) VALUES (OLD.id, OLD.Nombre, 'baja')
+    """,
+]
+
+CAMBIOS_SQLITE = [
+    # AUTOINCREMENT: las versiones no se reutilizan aunque se purgue el registro
+    """
+    CREATE TABLE IF NOT EXISTS productos_cambios (
+        version INTEGER PRIMARY KEY AUTOINCREMENT,
+        producto_id INTEGER NOT NULL,
+        Nombre TEXT NOT NULL,
+        operacion TEXT NOT NULL CHECK (operacion IN ('alta', 'modificacion', 'baja')),
+        fecha TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tr_productos_alta AFTER INSERT ON productos BEGIN
+        INSERT INTO productos_cambios (producto_id, Nombre, operacion) VALUES (NEW.id, NEW.Nombre, 'alta');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tr_productos_modificacion AFTER UPDATE ON productos BEGIN
+        INSERT INTO productos_cambios (producto_id, Nombre, operacion) VALUES (NEW.id, NEW.Nombre, 'modificacion');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tr_productos_baja AFTER DELETE ON productos BEGIN
+        INSERT INTO productos_cambios (producto_id, Nombre, operacion) VALUES (OLD.id, OLD.Nombre, 'baja');
+    END
+    """,
+]
+
+TABLAS = {
+    'normalizado': [
+        """
+        CREATE TABLE IF NOT EXISTS productos (
+            id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+            Nombre VARCHAR(100) NOT NULL,
+            Precio DOUBLE NOT NULL,
+            Stock INT NOT NULL,
+            Origen VARCHAR(100) NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE KEY uq_productos_nombre (Nombre),
+            KEY ix_productos_stock (Stock),
+            CONSTRAINT ck_productos_precio CHECK (Precio > 0),
+            CONSTRAINT ck_productos_stock CHECK (Stock >= 0)
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS productoalimenticio (
+            producto_id INT UNSIGNED NOT NULL,
+            fecha_vencimiento DATE NOT NULL,
+            PRIMARY KEY (producto_id),
+            KEY ix_productoalimenticio_vencimiento (fecha_vencimiento),
+            CONSTRAINT fk_productoalimenticio_producto FOREIGN KEY (producto_id)
+                REFERENCES productos (id) ON DELETE CASCADE
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS productoelectronico (
+            producto_id INT UNSIGNED NOT NULL,
+            fecha_fabricacion DATE NOT NULL,
+            PRIMARY KEY (producto_id),
+            KEY ix_productoelectronico_fabricacion (fecha_fabricacion),
+            CONSTRAINT fk_productoelectronico_producto FOREIGN KEY (producto_id)
+                REFERENCES productos (id) ON DELETE CASCADE
+        ) ENGINE=InnoDB
+        """,
+        *CAMBIOS,
+    ],
+    'tabla_unica': [
+        """
+        CREATE TABLE IF NOT EXISTS productos (
+            id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+            Nombre VARCHAR(100) NOT NULL,
+            Precio DOUBLE NOT NULL,
+            Stock INT NOT NULL,
+            Origen VARCHAR(100) NOT NULL,
+            tipo ENUM('producto', 'alimenticio', 'electronico') NOT NULL DEFAULT 'producto',
+            fecha_vencimiento DATE NULL,
+            fecha_fabricacion DATE NULL,
+            PRIMARY KEY (id),
+            UNIQUE KEY uq_productos_nombre (Nombre),
+            KEY ix_productos_stock (Stock),
+            KEY ix_productos_tipo (tipo),
+            KEY ix_productos_vencimiento (fecha_vencimiento),
+            KEY ix_productos_fabricacion (fecha_fabricacion),
+            CONSTRAINT ck_productos_precio CHECK (Precio > 0),
+            CONSTRAINT ck_productos_stock CHECK (Stock >= 0)
+        ) ENGINE=InnoDB
+        """,
+        *CAMBIOS,
+    ],
+}
+
+TABLAS_SQLITE = {
+    'normalizado': [
+        """
+        CREATE TABLE IF NOT EXISTS productos (
+            id INTEGER PRIMARY KEY,
+            Nombre TEXT NOT NULL COLLATE NOCASE UNIQUE,
+            Precio REAL NOT NULL CHECK (Precio > 0),
+            Stock INTEGER NOT NULL CHECK (Stock >= 0),
+            Origen TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_productos_stock ON productos (Stock)",
+        """
+        CREATE TABLE IF NOT EXISTS productoalimenticio (
+            producto_id INTEGER PRIMARY KEY REFERENCES productos (id) ON DELETE CASCADE,
+            fecha_vencimiento DATE NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_productoalimenticio_vencimiento ON productoalimenticio (fecha_vencimiento)",
+        """
+        CREATE TABLE IF NOT EXISTS productoelectronico (
+            producto_id INTEGER PRIMARY KEY REFERENCES productos (id) ON DELETE CASCADE,
+            fecha_fabricacion DATE NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_productoelectronico_fabricacion ON productoelectronico (fecha_fabricacion)",
+        *CAMBIOS_SQLITE,
+    ],
+    'tabla_unica': [
+        """
+        CREATE TABLE IF NOT EXISTS productos (
+            id INTEGER PRIMARY KEY,
+            Nombre TEXT NOT NULL COLLATE NOCASE UNIQUE,
+            Precio REAL NOT NULL CHECK (Precio > 0),
+            Stock INTEGER NOT NULL CHECK (Stock >= 0),
+            Origen TEXT NOT NULL,
+            tipo TEXT NOT NULL DEFAULT 'producto' CHECK (tipo IN ('producto', 'alimenticio', 'electronico')),
+            fecha_vencimiento DATE,
+            fecha_fabricacion DATE
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_productos_tipo ON productos (tipo)",
+        "CREATE INDEX IF NOT EXISTS ix_productos_stock ON productos (Stock)",
+        "CREATE INDEX IF NOT EXISTS ix_productos_vencimiento ON productos (fecha_vencimiento)",
+        "CREATE INDEX IF NOT EXISTS ix_productos_fabricacion ON productos (fecha_fabricacion)",
+        *CAMBIOS_SQLITE,
+    ],
+}
+
+# Consulta base de lectura de productos para cada diseño (se le agrega WHERE / ORDER BY)
+SELECT_PRODUCTOS = {
+    'normalizado': """
+        SELECT p.id, p.Nombre, p.Precio, p.Stock, p.Origen, pa.fecha_vencimiento, pe.fecha_fabricacion
+        FROM productos p
+        LEFT JOIN productoalimenticio pa ON pa.producto_id = p.id
+        LEFT JOIN productoelectronico pe ON pe.producto_id = p.id
+        """,
+    'tabla_unica': """
+        SELECT p.id, p.Nombre, p.Precio, p.Stock, p.Origen, p.fecha_vencimiento, p.fecha_fabricacion
+        FROM productos p
+        """,
+}
+
+# Columna de vencimiento de cada diseño, para filtrar por rango con su indice
+VENCIMIENTO = {
+    'normalizado': 'pa.fecha_vencimiento',
+    'tabla_unica': 'p.fecha_vencimiento',
+}
+
+def validar_esquema(esquema):
+    if esquema not in ESQUEMAS:
+        raise ValueError(f"Esquema desconocido: {esquema}. Opciones: {', '.join(ESQUEMAS)}")
+    return esquema
+
+def crear_esquema(connection, esquema='normalizado', motor='mysql'):
+    tablas = TABLAS_SQLITE if motor == 'sqlite' else TABLAS
+    with connection.cursor() as cursor:
+        for sentencia in tablas[validar_esquema(esquema)]:
+            cursor.execute(sentencia)
+    connection.commit()
+
+def eliminar_esquema(connection):
+    with connection.cursor() as cursor:
+        for tabla in ('productoalimenticio', 'productoelectronico', 'productos', 'productos_cambios'):
+            cursor.execute(f"DROP TABLE IF EXISTS {tabla}")
+    connection.commit()
+
+def migrar_esquema_por_nombre(connection, esquema='normalizado'):
+    # Migra el diseño anterior (subtablas unidas por Nombre) al diseño indicado.
+    # Las tablas viejas se conservan con el sufijo _legado.
+    with connection.cursor() as cursor:
+        # los triggers viajan con la tabla renombrada; se quitan para que crear_esquema
+        # pueda crearlos sobre la tabla nueva
+        for trigger in ('tr_productos_alta', 'tr_productos_modificacion', 'tr_productos_baja'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute("""
+            RENAME TABLE productos TO productos_legado,
+                         productoalimenticio TO productoalimenticio_legado,
+                         productoelectronico TO productoelectronico_legado
+        """)
+    crear_esquema(connection, esquema)
+
+    with connection.cursor() as cursor:
+        if esquema == 'normalizado':
+            cursor.execute("""
+                INSERT INTO productos (Nombre, Precio, Stock, Origen)
+                SELECT Nombre, Precio, Stock, Origen FROM productos_legado
+            """)
+            cursor.execute("""
+                INSERT INTO productoalimenticio (producto_id, fecha_vencimiento)
+                SELECT p.id, pa.fecha_vencimiento
+                FROM productoalimenticio_legado pa JOIN productos p ON p.Nombre = pa.Nombre
+            """)
+            cursor.execute("""
+                INSERT INTO productoelectronico (producto_id, fecha_fabricacion)
+                SELECT p.id, pe.fecha_fabricacion
+                FROM productoelectronico_legado pe JOIN productos p ON p.Nombre = pe.Nombre
+            """)
+        else:
+            cursor.execute("""
+                INSERT INTO productos (Nombre, Precio, Stock, Origen, tipo, fecha_vencimiento, fecha_fabricacion)
+                SELECT p.Nombre, p.Precio, p.Stock, p.Origen,
+                       CASE WHEN pa.Nombre IS NOT NULL THEN 'alimenticio'
+                            WHEN pe.Nombre IS NOT NULL THEN 'electronico'
+                            ELSE 'producto' END,
+                       pa.fecha_vencimiento, pe.fecha_fabricacion
+                FROM productos_legado p
+                LEFT JOIN productoalimenticio_legado pa ON pa.Nombre = p.Nombre
+                LEFT JOIN productoelectronico_legado pe ON pe.Nombre = p.Nombre
+            """)
+    connection.commit()
@@ -0,0 +1,200 @@
+""" Version asincronica de GestionProductos sobre aiomysql.
+
+Usa un pool de conexiones asincronico: las consultas concurrentes se solapan en lugar de
+esperar una detras de otra. Se configura con las mismas claves que GestionProductos.
+ """
+
+import asyncio
+import traceback
+
+import aiomysql
+from decouple import config
+from pymysql.constants import CLIENT
+from pymysql.err import IntegrityError
+
+from clases import CacheProductos, GestionProductos
+from esquema import SELECT_PRODUCTOS, validar_esquema
+
+class AsyncGestionProductos:
+    def __init__(self):
+        self.host = config('DB_HOST')
+        self.database = config('DB_NAME')
+        self.user = config('DB_USER')
+        self.password = config('DB_PASSWORD')
+        self.port = config('DB_PORT', cast=int)
+        self.esquema = validar_esquema(config('DB_ESQUEMA', default='normalizado'))
+        self.pool_size = config('DB_POOL_SIZE', default=5, cast=int)
+        self.__pool = None
+        self.__lock_pool = asyncio.Lock()
+
+        self.cache = CacheProductos(
+            tamano_maximo=config('CACHE_SIZE', default=1024, cast=int),
+            ttl=config('CACHE_TTL', default=60, cast=float)
+        )
+
+    async def connect(self):
+        if self.__pool is not None:
+            return self.__pool
+        async with self.__lock_pool:
+            if self.__pool is None:
+                self.__pool = await aiomysql.create_pool(
+                    host=self.host,
+                    port=self.port,
+                    user=self.user,
+                    password=self.password,
+                    db=self.database,
+                    minsize=1,
+                    maxsize=self.pool_size,
+                    pool_recycle=3600,
+                    # sin autocommit, cada lectura deja una transaccion abierta y el pool descarta la conexion
+                    autocommit=True,
+                    # rowcount cuenta las filas encontradas y no solo las cambiadas: un UPDATE con
+                    # el mismo valor no se informa como producto inexistente (igual que BackendMySQL)
+                    client_flag=CLIENT.FOUND_ROWS
+                )
+        return self.__pool
+
+    async def close(self):
+        if self.__pool is not None:
+            self.__pool.close()
+            await self.__pool.wait_closed()
+            self.__pool = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _insertar_filas(self, cursor, filas):
+        if self.esquema == 'tabla_unica':
+            await cursor.executemany(
+                '''INSERT INTO productos(Nombre, Precio, Stock, Origen, tipo, fecha_vencimiento, fecha_fabricacion)
+                VALUES(%s, %s, %s, %s, %s, %s, %s)''',
+                [fila + (tipo, fecha if tipo == 'alimenticio' else None, fecha if tipo == 'electronico' else None)
+                 for fila, tipo, fecha in filas]
+            )
+            return
+
+        await cursor.executemany(
+            'INSERT INTO productos(Nombre, Precio, Stock, Origen) VALUES(%s, %s, %s, %s)',
+            [fila for fila, _, _ in filas]
+        )
+        queries_especificas = {
+            'alimenticio': 'INSERT INTO productoalimenticio (producto_id, fecha_vencimiento) VALUES (%s, %s)',
+            'electronico': 'INSERT INTO productoelectronico (producto_id, fecha_fabricacion) VALUES (%s, %s)',
+        }
+        # Las subtablas se enlazan por id: se recuperan los ids recien generados en una consulta
+        con_subtipo = [(fila[0], tipo, fecha) for fila, tipo, fecha in filas if fecha is not None]
+        if not con_subtipo:
+            return
+        marcadores = ', '.join(['%s'] * len(con_subtipo))
+        await cursor.execute(f'SELECT id, Nombre FROM productos WHERE Nombre IN ({marcadores})',
+                             [nombre for nombre, _, _ in con_subtipo])
+        ids = {nombre.lower(): id_producto for id_producto, nombre in await cursor.fetchall()}
+        for tipo_tabla, query in queries_especificas.items():
+            filas_tabla = [(ids[nombre.lower()], fecha) for nombre, tipo, fecha in con_subtipo if tipo == tipo_tabla]
+            if filas_tabla:
+                await cursor.executemany(query, filas_tabla)
+
+    async def crear_producto(self, producto):
+        pool = await self.connect()
+        try:
+            async with pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await connection.begin()
+                    # El indice unico sobre Nombre rechaza duplicados, incluso entre pedidos concurrentes
+                    try:
+                        await self._insertar_filas(cursor, [GestionProductos._filas_producto(producto)])
+                        await connection.commit()
+                    except IntegrityError:
+                        await connection.rollback()
+                        print(f'Error: Ya existe el producto {producto.nombre}')
+                        return False
+                    except Exception:
+                        await connection.rollback()
+                        raise
+                self.cache.invalidar(producto.nombre)
+                print(f"El producto ({producto.nombre}) fue creado correctamente")
+                return True
+        except Exception as error:
+            print(f'Error inesperado al crear producto: {error}')
+            traceback.print_exc()
+            return False
+
+    async def leer_producto(self, nombre):
+        producto = self.cache.obtener(nombre)
+        if producto:
+            return producto
+
+        pool = await self.connect()
+        try:
+            async with pool.acquire() as connection:
+                async with connection.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(SELECT_PRODUCTOS[self.esquema] + "WHERE p.Nombre = %s", (nombre,))
+                    producto = await cursor.fetchone()
+                    if producto:
+                        self.cache.guardar(nombre, producto)
+                        return producto
+                    print(f"No se encontró el producto {nombre}")
+        except Exception as error:
+            print(f'Error inesperado al leer producto: {error}')
+            traceback.print_exc()
+        return None
+
+    async def _actualizar(self, query, parametros, nombre_producto, descripcion):
+        pool = await self.connect()
+        try:
+            async with pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(query, parametros)
+                    if cursor.rowcount > 0:
+                        await connection.commit()
+                        self.cache.invalidar(nombre_producto)
+                        print(f"El {descripcion} se actualizó correctamente para el producto {nombre_producto}")
+                        return True
+                    print(f"No se pudo actualizar el {descripcion} del producto {nombre_producto}")
+                    return False
+        except Exception as e:
+            print(f"Error al actualizar el {descripcion} del producto: {e}")
+            return False
+
+    async def actualizar_precio_producto(self, nombre_producto, nuevo_precio):
+        return await self._actualizar(
+            'UPDATE productos SET precio = %s WHERE nombre = %s', (nuevo_precio, nombre_producto), nombre_producto, 'precio'
+        )
+
+    async def actualizar_stock_producto(self, nombre_producto, nuevo_stock):
+        return await self._actualizar(
+            'UPDATE productos SET stock = %s WHERE nombre = %s', (nuevo_stock, nombre_producto), nombre_producto, 'stock'
+        )
+
+    async def eliminar_producto(self, nombre_producto):
+        pool = await self.connect()
+        try:
+            async with pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    # las subtablas se eliminan en cascada (ON DELETE CASCADE)
+                    await cursor.execute("DELETE FROM productos WHERE nombre = %s", (nombre_producto,))
+                    if cursor.rowcount > 0:
+                        await connection.commit()
+                        self.cache.invalidar(nombre_producto)
+                        return True
+                    print(f"No se encontró el producto {nombre_producto}")
+                    return False
+        except Exception as e:
+            print(f"Error al eliminar el producto: {e}")
+            return False
+
+    async def leer_todos_productos(self):
+        pool = await self.connect()
+        try:
+            async with pool.acquire() as connection:
+                async with connection.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(SELECT_PRODUCTOS[self.esquema])
+                    return list(await cursor.fetchall())
+        except Exception as error:
+            print(f'Error inesperado al leer productos: {error}')
+            traceback.print_exc()
+        return []
@@ -0,0 +1,273 @@
+""" Importacion y exportacion del catalogo en JSON, NDJSON y CSV.
+
+Los archivos se leen y escriben de forma incremental: nunca se carga el archivo completo ni
+todo el catalogo en memoria. El JSON admite el formato de productos_lista_db.json (objeto
+indexado por nombre) o una lista de registros. Las fechas pueden venir como aaaa-mm-dd o dd-mm-aaaa.
+
+Para archivos grandes, importar_productos(..., procesos=N) valida y construye los productos en
+un pool de N procesos, por bloques, mientras el proceso principal escribe en la base los bloques
+que ya estan listos.
+ """
+
+import csv
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from modelos import Producto, ProductoAlimenticio, ProductoElectronico, serializar_fecha
+
+# Caracteres que terminan un numero o literal de JSON (true, false, null)
+_FIN_ESCALAR = re.compile(r'[\s,\]}]')
+
+CAMPOS = ['nombre', 'precio', 'stock', 'origen', 'fecha_vencimiento', 'fecha_fabricacion']
+
+def producto_desde_registro(registro):
+    if not isinstance(registro, dict):
+        raise TypeError(f"Se esperaba un objeto con los datos del producto, no {type(registro).__name__}")
+    datos = (registro['nombre'], registro['precio'], registro['stock'], registro['origen'])
+    if registro.get('fecha_vencimiento'):
+        return ProductoAlimenticio(*datos, registro['fecha_vencimiento'])
+    if registro.get('fecha_fabricacion'):
+        return ProductoElectronico(*datos, registro['fecha_fabricacion'])
+    return Producto(*datos)
+
+class RegistroInvalido:
+    # Fila que no se pudo leer del archivo (p. ej. una linea NDJSON mal formada):
+    # validar_registros la informa como fila invalida y sigue con la siguiente
+    def __init__(self, error):
+        self.error = error
+
+def _validar_bloque(primer_numero, registros, compacto=False):
+    # Devuelve los productos validos y los errores por fila. En los procesos del pool (compacto)
+    # los productos viajan como (clase, datos): es mucho mas barato de serializar que el objeto.
+    productos = []
+    errores = []
+    for numero, registro in enumerate(registros, start=primer_numero):
+        if isinstance(registro, RegistroInvalido):
+            errores.append((numero, None, registro.error))
+            continue
+        try:
+            producto = producto_desde_registro(registro)
+            productos.append((type(producto), producto.datos()) if compacto else producto)
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            # una fila que no es un objeto (p. ej. null en NDJSON) tambien es un error de la fila
+            errores.append((numero, registro.get('nombre') if isinstance(registro, dict) else None, str(error)))
+    return productos, errores
+
+def validar_registros(registros, errores, procesos=1, tamano_bloque=5000):
+    # Genera los productos validos en el orden de entrada y agrega a `errores` las filas
+    # invalidas (numero, nombre, error) sin cortar la importacion
+    registros = iter(registros)
+    numero = 1
+
+    def siguiente_bloque():
+        nonlocal numero
+        bloque = list(islice(registros, tamano_bloque))
+        primer_numero = numero
+        numero += len(bloque)
+        return primer_numero, bloque
+
+    if procesos <= 1:
+        while True:
+            primer_numero, bloque = siguiente_bloque()
+            if not bloque:
+                return
+            productos, errores_bloque = _validar_bloque(primer_numero, bloque)
+            errores.extend(errores_bloque)
+            yield from productos
+
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        # como maximo 2 bloques por proceso en vuelo, para no leer el archivo entero por adelantado
+        en_vuelo = deque()
+        agotado = False
+        while True:
+            while not agotado and len(en_vuelo) < procesos * 2:
+                primer_numero, bloque = siguiente_bloque()
+                if not bloque:
+                    agotado = True
+                    break
+                en_vuelo.append(ejecutor.submit(_validar_bloque, primer_numero, bloque, True))
+            if not en_vuelo:
+                return
+            productos, errores_bloque = en_vuelo.popleft().result()
+            errores.extend(errores_bloque)
+            for clase, datos in productos:
+                yield clase._restaurar(*datos)
+
+def registro_desde_fila(fila):
+    registro = {
+        'nombre': fila['Nombre'],
+        'precio': float(fila['Precio']),
+        'stock': int(fila['Stock']),
+        'origen': fila['Origen'],
+    }
+    for campo in ('fecha_vencimiento', 'fecha_fabricacion'):
+        if fila.get(campo):
+            registro[campo] = serializar_fecha(fila[campo])
+    return registro
+
+def _leer_json(archivo, tamano_bloque=1 << 16):
+    # Decodifica de a un elemento por vez el objeto o lista de primer nivel
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    fin_archivo = False
+
+    def leer_bloque():
+        # agrega un bloque y descarta lo ya procesado para que el buffer no crezca
+        nonlocal buffer, pos, fin_archivo
+        bloque = archivo.read(tamano_bloque)
+        fin_archivo = not bloque
+        buffer, pos = buffer[pos:] + bloque, 0
+        return not fin_archivo
+
+    def siguiente():
+        # primer caracter que no es espacio, o '' al final del archivo
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if fin_archivo or not leer_bloque():
+                return ''
+
+    def decodificar():
+        nonlocal pos
+        if siguiente() not in ('{', '[', '"'):
+            # numeros y literales no tienen cierre: si el bloque los corta, raw_decode acepta
+            # solo el principio (12 de 123456), asi que se lee hasta ver donde terminan
+            while not _FIN_ESCALAR.search(buffer, pos) and not fin_archivo:
+                leer_bloque()
+        while True:
+            try:
+                valor, pos = decoder.raw_decode(buffer, pos)
+                return valor
+            except json.JSONDecodeError:
+                if fin_archivo or not leer_bloque():
+                    raise
+
+    def esperar(simbolo):
+        nonlocal pos
+        encontrado = siguiente()
+        if encontrado != simbolo:
+            raise ValueError(f"Se esperaba '{simbolo}' y se encontro {encontrado!r}" if encontrado
+                             else f"JSON incompleto, se esperaba '{simbolo}'")
+        pos += 1
+
+    apertura = siguiente()
+    if not apertura:
+        return
+    if apertura not in '{[':
+        raise ValueError("El JSON debe ser un objeto o una lista de productos")
+    cierre = '}' if apertura == '{' else ']'
+    pos += 1
+
+    if siguiente() == cierre:
+        pos += 1
+    else:
+        while True:
+            if apertura == '{':
+                if siguiente() != '"':
+                    raise ValueError("Las claves del objeto deben ser textos entre comillas")
+                clave = decodificar()
+                esperar(':')
+            valor = decodificar()
+            if apertura == '{' and isinstance(valor, dict):
+                valor.setdefault('nombre', clave)
+            yield valor
+            separador = siguiente()
+            if separador == cierre:
+                pos += 1
+                break
+            if separador != ',':
+                raise ValueError(f"Se esperaba ',' o '{cierre}' y se encontro {separador!r}" if separador
+                                 else "JSON incompleto")
+            pos += 1
+
+    if siguiente():
+        raise ValueError("Hay contenido despues del cierre del JSON")
+
+def leer_registros(ruta):
+    extension = os.path.splitext(ruta)[1].lower()
+    with open(ruta, encoding='utf-8', newline='') as archivo:
+        if extension == '.csv':
+            for registro in csv.DictReader(archivo):
+                yield {campo: valor for campo, valor in registro.items() if valor != ''}
+        elif extension in ('.ndjson', '.jsonl'):
+            for linea in archivo:
+                if linea.strip():
+                    try:
+                        yield json.loads(linea)
+                    except json.JSONDecodeError as error:
+                        yield RegistroInvalido(f"JSON invalido: {error}")
+        else:
+            try:
+                yield from _leer_json(archivo)
+            except ValueError as error:
+                # en un documento JSON no se puede seguir despues de un error de sintaxis
+                yield RegistroInvalido(f"JSON invalido, se corta la lectura: {error}")
+
+def importar_productos(gestion, ruta, tamano_lote=1000, procesos=1):
+    # procesos > 1: la validacion corre en paralelo con la escritura en la base
+    errores = []
+    completa = False
+
+    def productos_validos():
+        # crear_productos corta sin avisar si pierde la conexion o falla: la importacion
+        # esta completa solo si se llego al final del archivo
+        nonlocal completa
+        yield from validar_registros(leer_registros(ruta), errores, procesos, tamano_bloque=max(tamano_lote, 1000))
+        completa = True
+
+    inicio = time.perf_counter()
+    resumen = gestion.crear_productos(productos_validos(), tamano_lote=tamano_lote)
+    duracion = time.perf_counter() - inicio
+
+    insertados = sum(lote['insertados'] for lote in resumen)
+    resultado = {
+        'insertados': insertados,
+        'omitidos': sum(lote['omitidos'] for lote in resumen),
+        'fallidos': sum(len(lote['fallidos']) for lote in resumen),
+        'invalidos': errores,
+        'completa': completa,
+        'filas_por_segundo': insertados / duracion if duracion else 0.0,
+    }
+    print(f"Importados {insertados} productos en {duracion:.2f} s ({resultado['filas_por_segundo']:.0f} filas/seg), "
+          f"{len(errores)} registros invalidos")
+    if not completa:
+        print("La importacion se interrumpio antes del final del archivo")
+    return resultado
+
+def exportar_productos(gestion, ruta, tamano_pagina=5000):
+    extension = os.path.splitext(ruta)[1].lower()
+    cantidad = 0
+    inicio = time.perf_counter()
+    with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+        registros = (registro_desde_fila(fila) for fila in gestion.iterar_productos(tamano_pagina))
+        if extension == '.csv':
+            escritor = csv.DictWriter(archivo, fieldnames=CAMPOS)
+            escritor.writeheader()
+            for registro in registros:
+                escritor.writerow(registro)
+                cantidad += 1
+        elif extension in ('.ndjson', '.jsonl'):
+            for registro in registros:
+                archivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                cantidad += 1
+        else:
+            archivo.write('{')
+            for registro in registros:
+                separador = ',' if cantidad else ''
+                archivo.write(f"{separador}\n    {json.dumps(registro['nombre'], ensure_ascii=False)}: "
+                              f"{json.dumps(registro, ensure_ascii=False)}")
+                cantidad += 1
+            archivo.write('\n}\n')
+    duracion = time.perf_counter() - inicio
+    filas_por_segundo = cantidad / duracion if duracion else 0.0
+    print(f"Exportados {cantidad} productos en {duracion:.2f} s ({filas_por_segundo:.0f} filas/seg)")
+    return {'exportados': cantidad, 'filas_por_segundo': filas_por_segundo}
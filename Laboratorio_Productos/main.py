@@ -1,5 +1,6 @@
 import os
 import platform
+import sys
 from datetime import datetime
 
 from clases import (    
@@ -8,11 +9,15 @@ from clases import (
     GestionProductos
 )
 
+# Resultados por pagina en la busqueda por nombre parcial
+TAMANO_PAGINA_BUSQUEDA = 20
+
 def limpiar_pantalla():
     if platform.system() == 'Windows':
         os.system('cls')
     else:
-        os.system('clear')
+        # secuencia ANSI: evita lanzar un proceso `clear` en cada vuelta del menu
+        print("\033[2J\033[H", end='', flush=True)
 
 def mostrar_menu():
     print(" =============== Menú de Gestión de Productos =============== ")
@@ -23,7 +28,8 @@ def mostrar_menu():
     print(" 5. Actualizar Stock de Producto")
     print(" 6. Eliminar Producto")
     print(" 7. Mostrar todos los Productos")
-    print(" 8. Salir")
+    print(" 8. Buscar Productos por Nombre Parcial")
+    print(" 9. Salir")
     print(" ===============================================================")
 
 def agregar_producto(gestion: GestionProductos, tipo_producto):
@@ -93,6 +99,30 @@ def buscar_producto_por_nombre(gestion):
     
     input("\nPresione Enter para continuar")
 
+def buscar_productos_por_texto(gestion):
+    texto = input("Ingrese el texto a buscar: ")
+    print("Tipo de búsqueda: 1. Comienza con  2. Contiene  3. Aproximada")
+    modo = {'1': 'prefijo', '2': 'subcadena', '3': 'aproximado'}.get(input("Seleccione una opción: "), 'subcadena')
+    
+    pagina = 1
+    while True:
+        productos, total = gestion.buscar_productos(texto, modo, pagina, TAMANO_PAGINA_BUSQUEDA)
+        if total == 0:
+            print(f"No se encontraron productos para '{texto}'")
+            break
+        
+        desde = (pagina - 1) * TAMANO_PAGINA_BUSQUEDA
+        print(f"\n=========== Resultados {desde + 1}-{desde + len(productos)} de {total} ===========")
+        for producto in productos:
+            mostrar_info_producto(producto)
+            print("-------------------------------------------------------")
+        
+        if pagina * TAMANO_PAGINA_BUSQUEDA >= total or input("\nPresione 's' para ver más resultados: ").lower() != 's':
+            break
+        pagina += 1
+    
+    input("\nPresione Enter para continuar")
+
 def mostrar_info_producto(producto):
     print("\nInformación del producto:")
     print(f"Nombre: {producto['Nombre']}")
@@ -119,14 +149,16 @@ def actualizar_precio_producto(gestion):
         
         if opcion == '1':
             nuevo_precio = float(input("Ingrese el nuevo precio: "))
+            actualizado = gestion.actualizar_precio_producto(nombre, nuevo_precio)
         elif opcion == '2':
             porcentaje = float(input("Ingrese el porcentaje de cambio (positivo para aumentar, negativo para disminuir): "))
-            nuevo_precio = precio_actual * (1 + porcentaje/100)
+            nuevo_precio = gestion.ajustar_precio_producto(nombre, porcentaje)
+            actualizado = nuevo_precio is not None
         else:
             print("Opción no válida.")
             return
         
-        if gestion.actualizar_precio_producto(nombre, nuevo_precio):
+        if actualizado:
             diferencia = nuevo_precio - precio_actual
             if diferencia > 0:
                 print(f"El precio de {nombre} aumentó en ${diferencia:.2f}.")
@@ -152,14 +184,16 @@ def actualizar_stock_producto(gestion):
         
         if opcion == '1':
             nuevo_stock = int(input("Ingrese el nuevo valor de Stock: "))
+            actualizado = gestion.actualizar_stock_producto(nombre, nuevo_stock)
         elif opcion == '2':
             cantidad = int(input("Ingrese la cantidad a añadir (positivo) o restar (negativo): "))
-            nuevo_stock = stock_actual + cantidad
+            nuevo_stock = gestion.ajustar_stock_producto(nombre, cantidad)
+            actualizado = nuevo_stock is not None
         else:
             print("Opción no válida.")
             return
         
-        if gestion.actualizar_stock_producto(nombre, nuevo_stock):
+        if actualizado:
             diferencia = nuevo_stock - stock_actual
             if diferencia > 0:
                 print(f"El stock de {nombre} aumentó en {diferencia} unidades.")
@@ -194,19 +228,25 @@ def eliminar_producto(gestion):
 
 def mostrar_todos_los_productos(gestion):
     print("\n=========== Listado Completo de Productos ================")
-    productos = gestion.leer_todos_productos()
+    cantidad = 0
     
-    if productos:
-        for producto in productos:
-            mostrar_info_producto(producto)
-            print("-------------------------------------------------------")
-    else:
+    for producto in gestion.iterar_productos():
+        mostrar_info_producto(producto)
+        print("-------------------------------------------------------")
+        cantidad += 1
+    
+    if cantidad == 0:
         print("No se encontraron productos en la base de datos.")
     
     print("===============================================================")
     input("\nPresione Enter para continuar")
 
 if __name__ == "__main__":
+    # con argumentos: modo no interactivo (ver comandos.py)
+    if len(sys.argv) > 1:
+        from comandos import main
+        sys.exit(main(sys.argv[1:]))
+    
     gestion = GestionProductos()
     
     while True:
@@ -227,6 +267,8 @@ if __name__ == "__main__":
         elif opcion == '7':
             mostrar_todos_los_productos(gestion)
         elif opcion == '8':
+            buscar_productos_por_texto(gestion)
+        elif opcion == '9':
             print("Saliendo del programa...")
             break
         else:
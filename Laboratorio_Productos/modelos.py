@@ -0,0 +1,265 @@
+""" Modelo de productos, sin dependencias de la base de datos.
+
+Producto, ProductoElectronico y ProductoAlimenticio validan y normalizan sus datos al
+construirse; ProductoBatch guarda muchos productos en forma columnar. Este modulo solo usa la
+biblioteca estandar: validar o formatear productos no importa el driver ni lee la configuracion.
+clases.py lo reexporta junto con GestionProductos.
+ """
+
+import sys
+from array import array
+from datetime import date, datetime
+
+def parsear_fecha(fecha):
+    # Acepta date, 'aaaa-mm-dd' (camino rapido con fromisoformat) o 'dd-mm-aaaa'
+    if isinstance(fecha, datetime):
+        return fecha.date()
+    if isinstance(fecha, date):
+        return fecha
+    if len(fecha) == 10 and fecha[4] == '-':
+        return date.fromisoformat(fecha)
+    if len(fecha) == 10 and fecha[2] == '-' == fecha[5] and (fecha[:2] + fecha[3:5] + fecha[6:]).isdigit():
+        # dd-mm-aaaa sin strptime, que es varias veces mas lento
+        return date(int(fecha[6:]), int(fecha[3:5]), int(fecha[:2]))
+    return datetime.strptime(fecha, '%d-%m-%Y').date()
+
+def serializar_fecha(obj):
+    # default= para json.dumps de filas con fechas
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+class Producto:
+    # __slots__ evita el __dict__ por instancia; los valores se normalizan una sola vez al construir
+    __slots__ = ('__nombre', '__precio', '__stock', '__origen')
+    
+    def __init__(self, nombre, precio, stock, origen):
+        self.__nombre = nombre.capitalize()
+        self.__precio = self.validar_precio(precio)
+        self.__stock = self.validar_stock(stock)
+        self.__origen = sys.intern(origen.capitalize())
+    
+    @property    
+    def nombre(self):
+        return self.__nombre
+    
+    @property
+    def precio(self):
+        return self.__precio
+    
+    @property
+    def stock(self):
+        return self.__stock
+    
+    @property
+    def origen(self):
+        return self.__origen
+    
+    #SETTERS
+    
+    @precio.setter
+    def precio(self, nuevo_precio):
+        self.__precio = self.validar_precio(nuevo_precio) 
+
+    @stock.setter
+    def stock(self, nuevo_stock):
+        self.__stock = self.validar_stock(nuevo_stock)
+        
+    @staticmethod
+    def validar_precio(precio):
+        try:
+            precio_num = float(precio)
+            if precio_num <= 0:
+                raise ValueError("El precio debe ser mayor a 0")
+            return precio_num
+        except ValueError as e:
+            raise ValueError(f"Error en el precio: {str(e)}")
+
+    @staticmethod
+    def validar_stock(stock):
+        try:
+            stock_num = int(stock)
+            if stock_num < 0:
+                raise ValueError("El stock no puede ser negativo")
+            return stock_num
+        except ValueError as e:
+            raise ValueError(f"Error en el stock: {str(e)}")
+    
+    
+    #FUNCIONES
+    def to_dict(self):
+        return {
+            "nombre": self.__nombre,
+            "precio": self.__precio,
+            "stock": self.__stock,
+            "origen": self.__origen             
+        }
+        
+    def __str__(self):
+        return f"{self.nombre}"
+    
+    # Forma compacta de un producto ya validado, p. ej. para enviarlo entre procesos en la
+    # importacion en paralelo; _restaurar lo reconstruye sin volver a validar
+    def datos(self):
+        return (self.__nombre, self.__precio, self.__stock, self.__origen)
+    
+    @classmethod
+    def _restaurar(cls, nombre, precio, stock, origen):
+        producto = cls.__new__(cls)
+        producto.__nombre = nombre
+        producto.__precio = precio
+        producto.__stock = stock
+        producto.__origen = sys.intern(origen)
+        return producto
+    
+class ProductoElectronico(Producto):
+    __slots__ = ('__fecha_fabricacion', '__fecha_fabricacion_texto')
+    
+    def __init__(self, nombre, precio, stock, origen, fecha_fabricacion):
+        super().__init__(nombre, precio, stock, origen)        
+        self.fecha_fabricacion = fecha_fabricacion
+        
+    
+    @property
+    def fecha_fabricacion(self):
+        return self.__fecha_fabricacion_texto
+    
+    @fecha_fabricacion.setter
+    def fecha_fabricacion(self, nueva_fecha):
+        self.__fecha_fabricacion = self.validar_fecha(nueva_fecha)
+        self.__fecha_fabricacion_texto = self.__fecha_fabricacion.isoformat()
+    
+    @property
+    def fecha_fabricacion_date(self):
+        return self.__fecha_fabricacion
+    
+    def validar_fecha(self, fecha):
+        try: 
+            return parsear_fecha(fecha)
+        except ValueError:
+            raise ValueError("Ingrese un formato de fecha correcto: aaaa-mm-dd o dd-mm-aaaa")
+        
+        
+    def to_dict(self):
+        data = super().to_dict()
+        data['fecha_fabricacion'] = self.__fecha_fabricacion_texto 
+        return data
+        
+    def __str__(self):
+        return f'{super().__str__()} - Fecha de Fabricación: {self.fecha_fabricacion}'
+    
+    def datos(self):
+        return (*super().datos(), self.__fecha_fabricacion_texto)
+    
+    @classmethod
+    def _restaurar(cls, nombre, precio, stock, origen, fecha_fabricacion):
+        producto = super()._restaurar(nombre, precio, stock, origen)
+        producto.__fecha_fabricacion = date.fromisoformat(fecha_fabricacion)
+        producto.__fecha_fabricacion_texto = fecha_fabricacion
+        return producto
+
+class ProductoAlimenticio(Producto):
+    __slots__ = ('__fecha_vencimiento', '__fecha_vencimiento_texto')
+    
+    def __init__(self, nombre, precio, stock, origen, fecha_vencimiento):
+        super().__init__(nombre, precio, stock, origen)        
+        self.fecha_vencimiento = fecha_vencimiento
+        
+    
+    @property
+    def fecha_vencimiento(self):
+        return self.__fecha_vencimiento_texto 
+       
+    @fecha_vencimiento.setter
+    def fecha_vencimiento(self, nueva_fecha):
+        self.__fecha_vencimiento = self.validar_fecha(nueva_fecha) 
+        self.__fecha_vencimiento_texto = self.__fecha_vencimiento.isoformat()
+    
+    @property
+    def fecha_vencimiento_date(self):
+        return self.__fecha_vencimiento
+        
+    def validar_fecha(self, fecha):
+        try: 
+            return parsear_fecha(fecha)
+        except ValueError:
+            raise ValueError("Ingrese un formato de fecha correcto: aaaa-mm-dd o dd-mm-aaaa")
+    
+    
+    def to_dict(self):
+        data = super().to_dict()
+        data['fecha_vencimiento'] = self.__fecha_vencimiento_texto 
+        return data
+        
+    def __str__(self):
+        return f'{super().__str__()} - Fecha de Vencimiento: {self.fecha_vencimiento}'
+    
+    def datos(self):
+        return (*super().datos(), self.__fecha_vencimiento_texto)
+    
+    @classmethod
+    def _restaurar(cls, nombre, precio, stock, origen, fecha_vencimiento):
+        producto = super()._restaurar(nombre, precio, stock, origen)
+        producto.__fecha_vencimiento = date.fromisoformat(fecha_vencimiento)
+        producto.__fecha_vencimiento_texto = fecha_vencimiento
+        return producto
+
+class ProductoBatch:
+    # Coleccion columnar de productos: arreglos paralelos en lugar de un objeto por producto.
+    # Las fechas se guardan como ordinales (0 = sin fecha) y los origenes se internan.
+    TIPOS = ('producto', 'alimenticio', 'electronico')
+    
+    def __init__(self):
+        self.nombres = []
+        self.precios = array('d')
+        self.stocks = array('q')
+        self.origenes = []
+        self.tipos = array('b')
+        self.fechas = array('l')
+    
+    @classmethod
+    def desde_filas(cls, filas):
+        batch = cls()
+        for fila in filas:
+            batch.agregar_fila(fila)
+        return batch
+    
+    def agregar_fila(self, fila):
+        if fila.get('fecha_vencimiento'):
+            tipo, fecha = 1, fila['fecha_vencimiento']
+        elif fila.get('fecha_fabricacion'):
+            tipo, fecha = 2, fila['fecha_fabricacion']
+        else:
+            tipo, fecha = 0, None
+        
+        self.nombres.append(fila['Nombre'])
+        self.precios.append(float(fila['Precio']))
+        self.stocks.append(int(fila['Stock']))
+        self.origenes.append(sys.intern(fila['Origen']))
+        self.tipos.append(tipo)
+        self.fechas.append(fecha.toordinal() if fecha else 0)
+    
+    def agregar_producto(self, producto):
+        fila = {'Nombre': producto.nombre, 'Precio': producto.precio, 'Stock': producto.stock, 'Origen': producto.origen}
+        if isinstance(producto, ProductoAlimenticio):
+            fila['fecha_vencimiento'] = producto.fecha_vencimiento_date
+        elif isinstance(producto, ProductoElectronico):
+            fila['fecha_fabricacion'] = producto.fecha_fabricacion_date
+        self.agregar_fila(fila)
+    
+    def __len__(self):
+        return len(self.nombres)
+    
+    def producto(self, i):
+        # Reconstruye el objeto Producto de la posicion i
+        tipo = self.TIPOS[self.tipos[i]]
+        datos = (self.nombres[i], self.precios[i], self.stocks[i], self.origenes[i])
+        if tipo == 'alimenticio':
+            return ProductoAlimenticio(*datos, date.fromordinal(self.fechas[i]).isoformat())
+        if tipo == 'electronico':
+            return ProductoElectronico(*datos, date.fromordinal(self.fechas[i]).isoformat())
+        return Producto(*datos)
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.producto(i)
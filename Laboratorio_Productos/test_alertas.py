@@ -0,0 +1,123 @@
+""" Pruebas de MonitorAlertas contra SQLite.
+
+Cada alerta se informa una sola vez, los cambios llegan por el registro de cambios (tambien
+los de otros procesos) y los vencimientos mas alla del horizonte cargado se agregan al
+extenderlo.
+
+    python -m pytest -q
+ """
+
+from datetime import date, timedelta
+
+import pytest
+
+from alertas import MonitorAlertas
+from almacenamiento import crear_backend
+from clases import GestionProductos, ProductoAlimenticio, ProductoElectronico
+
+HOY = date(2026, 6, 1)
+
+def leche(nombre, vencimiento, stock=10):
+    return ProductoAlimenticio(nombre, 100, stock, 'Argentina', vencimiento)
+
+def nueva_gestion(ruta):
+    gestion = GestionProductos(backend=crear_backend('sqlite', ruta=ruta), replicas=[])
+    gestion.instrumentacion = None
+    gestion.cache.tamano_maximo = 0
+    return gestion
+
+@pytest.fixture
+def gestion(tmp_path):
+    gestion = nueva_gestion(str(tmp_path / 'productos.db'))
+    assert gestion.crear_tablas()
+    return gestion
+
+@pytest.fixture
+def monitor(gestion):
+    return MonitorAlertas(gestion, dias_vencimiento=7, stock_minimo=5)
+
+def alertas(monitor, dia):
+    return sorted((alerta['tipo'], alerta['Nombre']) for alerta in monitor.revisar(dia))
+
+def test_primera_revision(gestion, monitor):
+    gestion.crear_productos([
+        leche('Pronto', HOY + timedelta(days=3)),
+        leche('Lejos', HOY + timedelta(days=20)),
+        leche('Vencida', HOY - timedelta(days=1)),
+        ProductoElectronico('Radio', 10, 2, 'China', '2020-01-01'),
+    ])
+    resultado = monitor.revisar(HOY)
+    assert sorted((alerta['tipo'], alerta['Nombre']) for alerta in resultado) == [
+        ('stock_bajo', 'Radio'), ('vencimiento', 'Pronto')]
+    vencimiento = next(alerta for alerta in resultado if alerta['tipo'] == 'vencimiento')
+    assert (vencimiento['fecha_vencimiento'], vencimiento['dias']) == (HOY + timedelta(days=3), 3)
+
+def test_cada_alerta_se_informa_una_vez(gestion, monitor):
+    gestion.crear_productos([leche('Pronto', HOY + timedelta(days=3)), leche('Poca', '2030-01-01', stock=1)])
+    assert alertas(monitor, HOY) == [('stock_bajo', 'Poca'), ('vencimiento', 'Pronto')]
+    assert alertas(monitor, HOY) == []
+    # un cambio que no saca al producto de la alerta no la repite
+    gestion.actualizar_stock_producto('Poca', 2)
+    gestion.actualizar_precio_producto('Pronto', 120)
+    assert alertas(monitor, HOY + timedelta(days=1)) == []
+
+def test_stock_bajo_se_repite_despues_de_reponer(gestion, monitor):
+    gestion.crear_producto(leche('Poca', '2030-01-01', stock=1))
+    assert alertas(monitor, HOY) == [('stock_bajo', 'Poca')]
+    gestion.actualizar_stock_producto('Poca', 10)
+    assert alertas(monitor, HOY) == []
+    gestion.ajustar_stock_producto('Poca', -8)
+    assert alertas(monitor, HOY) == [('stock_bajo', 'Poca')]
+
+def test_cambios_de_vencimiento(gestion, monitor):
+    gestion.crear_productos([leche('Postergada', HOY + timedelta(days=3)), leche('Adelantada', HOY + timedelta(days=20))])
+    assert monitor.revisar(HOY)[0]['Nombre'] == 'Postergada'
+    # el vencimiento cambia volviendo a crear el producto: la entrada vieja del monticulo se descarta
+    gestion.eliminar_producto('Postergada')
+    gestion.crear_producto(leche('Postergada', HOY + timedelta(days=25)))
+    gestion.eliminar_producto('Adelantada')
+    gestion.crear_producto(leche('Adelantada', HOY + timedelta(days=5)))
+    assert alertas(monitor, HOY) == [('vencimiento', 'Adelantada')]
+    assert alertas(monitor, HOY + timedelta(days=18)) == [('vencimiento', 'Postergada')]
+
+def test_baja_no_avisa(gestion, monitor):
+    gestion.crear_producto(leche('Borrada', HOY + timedelta(days=10)))
+    assert alertas(monitor, HOY) == []
+    gestion.eliminar_producto('Borrada')
+    assert alertas(monitor, HOY + timedelta(days=5)) == []
+
+def test_extension_del_horizonte(gestion, monitor):
+    # la primera revision carga vencimientos hasta HOY + 7 + HORIZONTE_DIAS
+    limite = HOY + timedelta(days=7 + MonitorAlertas.HORIZONTE_DIAS)
+    gestion.crear_productos([
+        leche('En el limite', limite),
+        leche('Fuera', limite + timedelta(days=1)),
+        leche('Mucho despues', limite + timedelta(days=40)),
+    ])
+    assert alertas(monitor, HOY) == []
+    assert monitor.limite == limite and set(monitor.fechas) == {'En el limite'}
+
+    # al avanzar, el aviso pasa el limite y se cargan los vencimientos del tramo siguiente
+    dia = limite - timedelta(days=6)
+    assert alertas(monitor, dia) == [('vencimiento', 'En el limite'), ('vencimiento', 'Fuera')]
+    assert monitor.limite == dia + timedelta(days=7 + MonitorAlertas.HORIZONTE_DIAS)
+    assert 'Mucho despues' not in monitor.fechas
+    assert alertas(monitor, dia) == []
+
+    dia = limite + timedelta(days=35)
+    assert alertas(monitor, dia) == [('vencimiento', 'Mucho despues')]
+    # los ya vencidos dejan de seguirse
+    assert set(monitor.fechas) == {'Mucho despues'}
+
+def test_alta_fuera_del_horizonte_se_carga_al_extender(gestion, monitor):
+    assert alertas(monitor, HOY) == []
+    gestion.crear_producto(leche('Tardia', HOY + timedelta(days=60)))
+    assert alertas(monitor, HOY + timedelta(days=1)) == []
+    assert alertas(monitor, HOY + timedelta(days=55)) == [('vencimiento', 'Tardia')]
+
+def test_escrituras_de_otro_proceso(gestion, monitor):
+    assert alertas(monitor, HOY) == []
+    otra = nueva_gestion(gestion.backend.ruta)
+    otra.crear_productos([leche('Pronto', HOY + timedelta(days=2)), leche('Poca', '2030-01-01', stock=0)])
+    assert alertas(monitor, HOY) == [('stock_bajo', 'Poca'), ('vencimiento', 'Pronto')]
+    assert alertas(monitor, HOY) == []
@@ -0,0 +1,104 @@
+""" Pruebas de la busqueda por nombre parcial.
+
+IndiceNombres se prueba en memoria (orden de relevancia de cada modo); BusquedaProductos,
+contra SQLite, incluidos los cambios que llegan por el registro de cambios.
+
+    python -m pytest -q
+ """
+
+import pytest
+
+from almacenamiento import crear_backend
+from busqueda import BusquedaProductos, IndiceNombres
+from clases import GestionProductos, ProductoAlimenticio
+
+# como los guarda Producto: primera letra en mayuscula y el resto en minuscula
+NOMBRES = ['Leche entera', 'Leche descremada', 'Dulce de leche', 'Lechuga', 'Manteca', 'Yogur de leche', 'Pan']
+
+@pytest.fixture
+def indice():
+    indice = IndiceNombres()
+    indice.cargar(NOMBRES)
+    return indice
+
+def test_prefijo_en_orden_alfabetico(indice):
+    assert indice.buscar('lech', 'prefijo') == (['Leche descremada', 'Leche entera', 'Lechuga'], 3)
+    assert indice.buscar('LECHE ', 'prefijo') == (['Leche descremada', 'Leche entera'], 2)
+    assert indice.buscar('x', 'prefijo') == ([], 0)
+
+def test_prefijo_pagina(indice):
+    assert indice.buscar('lech', 'prefijo', desplazamiento=1, limite=1) == (['Leche entera'], 3)
+    assert indice.buscar('', 'prefijo', limite=2) == (['Dulce de leche', 'Leche descremada'], len(NOMBRES))
+
+def test_subcadena_primero_al_principio_y_mas_cortos(indice):
+    # al principio del nombre primero; despues por posicion, largo y orden alfabetico
+    assert indice.buscar('leche', 'subcadena') == (
+        ['Leche entera', 'Leche descremada', 'Dulce de leche', 'Yogur de leche'], 4)
+    assert indice.buscar('de leche', 'subcadena') == (['Dulce de leche', 'Yogur de leche'], 2)
+
+def test_subcadena_corta_recorre_el_catalogo(indice):
+    assert indice.buscar('an', 'subcadena') == (['Pan', 'Manteca'], 2)
+
+def test_aproximado_tolera_errores_de_tipeo(indice):
+    assert indice.buscar('lehce entera', 'aproximado') == (['Leche entera'], 1)
+    assert indice.buscar('mantca', 'aproximado') == (['Manteca'], 1)
+    assert indice.buscar('zzzz', 'aproximado') == ([], 0)
+
+def test_aproximado_ordena_por_similitud(indice):
+    # mas trigramas en comun (en proporcion al largo) primero; con la misma similitud,
+    # el nombre mas corto y despues el orden alfabetico
+    assert indice.buscar('leche', 'aproximado') == (
+        ['Leche entera', 'Lechuga', 'Leche descremada', 'Dulce de leche', 'Yogur de leche'], 5)
+    assert indice.buscar('leche', 'aproximado', desplazamiento=3, limite=1) == (['Dulce de leche'], 5)
+
+def test_aproximado_con_presupuesto_minimo():
+    indice = IndiceNombres(presupuesto_aproximado=1)
+    indice.cargar(NOMBRES)
+    # el trigrama mas raro se recorre siempre, aunque supere el presupuesto
+    assert indice.buscar('manteca', 'aproximado')[0] == ['Manteca']
+
+def test_agregar_y_eliminar(indice):
+    indice.agregar('Lechon')
+    indice.agregar('lechon')
+    indice.eliminar('Lechuga')
+    indice.eliminar('No existe')
+    assert indice.buscar('lech', 'prefijo') == (['Leche descremada', 'Leche entera', 'Lechon'], 3)
+    assert 'Lechuga' not in indice.buscar('lechuga', 'aproximado')[0]
+    assert len(indice) == len(NOMBRES)
+
+def test_modo_desconocido(indice):
+    with pytest.raises(ValueError):
+        indice.buscar('leche', 'exacto')
+
+# --- BusquedaProductos contra SQLite ---
+
+@pytest.fixture
+def gestion(tmp_path):
+    gestion = GestionProductos(backend=crear_backend('sqlite', ruta=str(tmp_path / 'productos.db')), replicas=[])
+    gestion.instrumentacion = None
+    gestion.cache.tamano_maximo = 0
+    assert gestion.crear_tablas()
+    gestion.crear_productos([ProductoAlimenticio(nombre, 100, 10, 'Argentina', '2030-01-01') for nombre in NOMBRES])
+    gestion.busqueda = BusquedaProductos(gestion, intervalo=0, presupuesto_aproximado=1000)
+    return gestion
+
+def test_buscar_productos_devuelve_filas_y_total(gestion):
+    productos, total = gestion.buscar_productos('lech', 'prefijo', pagina=2, tamano_pagina=2)
+    assert total == 3
+    assert [producto['Nombre'] for producto in productos] == ['Lechuga']
+    assert productos[0]['Stock'] == 10
+
+def test_buscar_productos_sigue_los_cambios(gestion):
+    assert gestion.buscar_productos('lechon', 'prefijo')[1] == 0
+    gestion.crear_producto(ProductoAlimenticio('Lechon', 100, 1, 'Argentina', '2030-01-01'))
+    gestion.eliminar_producto('Lechuga')
+    nombres = [producto['Nombre'] for producto in gestion.buscar_productos('lech', 'prefijo')[0]]
+    assert nombres == ['Leche descremada', 'Leche entera', 'Lechon']
+
+def test_buscar_productos_ve_escrituras_de_otro_proceso(gestion):
+    gestion.buscar_productos('pan', 'prefijo')
+    # otra instancia sobre la misma base: el cambio llega solo por el registro de cambios
+    otra = GestionProductos(backend=crear_backend('sqlite', ruta=gestion.backend.ruta), replicas=[])
+    otra.instrumentacion = None
+    otra.crear_producto(ProductoAlimenticio('Panceta', 100, 1, 'Argentina', '2030-01-01'))
+    assert [producto['Nombre'] for producto in gestion.buscar_productos('pan', 'prefijo')[0]] == ['Pan', 'Panceta']
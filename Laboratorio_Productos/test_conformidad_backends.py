@@ -0,0 +1,341 @@
+""" Pruebas de conformidad de los backends de almacenamiento.
+
+Las mismas pruebas corren contra cada motor y cada diseño de esquema: GestionProductos debe
+comportarse igual en todos. SQLite corre siempre (archivo temporal). MySQL corre solo si
+DB_NAME_PRUEBAS indica una base de pruebas (el resto de la conexion sale del .env); esa base
+se vacia antes y despues de cada prueba.
+
+    python -m pytest -q
+ """
+
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from almacenamiento import crear_backend, crear_replicas
+from clases import GestionProductos, ProductoAlimenticio, ProductoElectronico
+from esquema import ESQUEMAS, eliminar_esquema
+
+MOTORES = [(motor, esquema) for motor in ('sqlite', 'mysql') for esquema in ESQUEMAS]
+
+def _vaciar(gestion):
+    connection = gestion.connect()
+    try:
+        eliminar_esquema(connection)
+    finally:
+        gestion.cerrar_conexion(connection)
+
+@pytest.fixture(params=MOTORES, ids=[f"{motor}-{esquema}" for motor, esquema in MOTORES])
+def gestion(request, tmp_path):
+    motor, esquema = request.param
+    if motor == 'sqlite':
+        backend = crear_backend('sqlite', ruta=str(tmp_path / 'productos.db'))
+    else:
+        base = os.environ.get('DB_NAME_PRUEBAS')
+        if not base:
+            pytest.skip("DB_NAME_PRUEBAS no configurada")
+        backend = crear_backend('mysql', usar_pool=False)
+        backend.database = base
+
+    gestion = GestionProductos(backend=backend, replicas=[])
+    gestion.esquema = esquema
+    gestion.instrumentacion = None
+    gestion.cache.tamano_maximo = 0
+    if motor == 'mysql':
+        _vaciar(gestion)
+    assert gestion.crear_tablas()
+    yield gestion
+    if motor == 'mysql':
+        _vaciar(gestion)
+
+def leche(nombre='Leche', stock=10, vencimiento='2030-01-01'):
+    return ProductoAlimenticio(nombre, 100, stock, 'Argentina', vencimiento)
+
+def televisor(nombre='Televisor', stock=3):
+    return ProductoElectronico(nombre, 5000, stock, 'China', '2020-06-15')
+
+# --- Altas, lecturas, cambios y bajas ---
+
+def test_crear_y_leer(gestion):
+    gestion.crear_producto(leche())
+    gestion.crear_producto(televisor())
+
+    producto = gestion.leer_producto('Leche')
+    assert producto['Nombre'] == 'Leche'
+    assert producto['Precio'] == 100
+    assert producto['Stock'] == 10
+    assert producto['Origen'] == 'Argentina'
+    assert producto['fecha_vencimiento'] == date(2030, 1, 1)
+    assert producto['fecha_fabricacion'] is None
+    assert gestion.leer_producto('Televisor')['fecha_fabricacion'] == date(2020, 6, 15)
+
+def test_leer_inexistente(gestion):
+    assert gestion.leer_producto('Nada') is None
+
+def test_nombre_duplicado_no_se_crea(gestion):
+    gestion.crear_producto(leche(stock=10))
+    gestion.crear_producto(leche(stock=99))
+    assert gestion.leer_producto('Leche')['Stock'] == 10
+    assert len(gestion.leer_todos_productos()) == 1
+
+def test_actualizar_precio_y_stock(gestion):
+    gestion.crear_producto(leche())
+    assert gestion.actualizar_precio_producto('Leche', 150) is True
+    assert gestion.actualizar_stock_producto('Leche', 4) is True
+    producto = gestion.leer_producto('Leche')
+    assert (producto['Precio'], producto['Stock']) == (150, 4)
+
+def test_actualizar_con_el_mismo_valor(gestion):
+    gestion.crear_producto(leche())
+    assert gestion.actualizar_precio_producto('Leche', 100) is True
+    assert gestion.actualizar_stock_producto('Leche', 10) is True
+
+def test_actualizar_inexistente(gestion):
+    assert gestion.actualizar_precio_producto('Nada', 10) is False
+    assert gestion.actualizar_stock_producto('Nada', 10) is False
+
+def test_eliminar(gestion):
+    gestion.crear_producto(leche())
+    assert gestion.eliminar_producto('Leche') is True
+    assert gestion.leer_producto('Leche') is None
+    assert gestion.eliminar_producto('Leche') is False
+
+# --- Operaciones por lotes ---
+
+def test_crear_productos_por_lotes(gestion):
+    gestion.crear_producto(leche('Existente'))
+    productos = [leche(f'Producto{i:03d}') for i in range(25)] + [leche('Existente'), leche('Producto000')]
+    resumen = gestion.crear_productos(productos, tamano_lote=10)
+
+    assert sum(lote['insertados'] for lote in resumen) == 25
+    assert sum(lote['omitidos'] for lote in resumen) == 2
+    assert not any(lote['fallidos'] for lote in resumen)
+    assert 'nombres_insertados' not in resumen[0]
+    assert len(gestion.leer_todos_productos()) == 26
+
+def test_crear_productos_con_nombres(gestion):
+    productos = [leche('Uno'), leche('Dos'), leche('Uno'), leche('Tres'), leche('Dos')]
+    resumen = gestion.crear_productos(productos, tamano_lote=2, nombres=True)
+    assert [nombre for lote in resumen for nombre in lote['nombres_insertados']] == ['Uno', 'Dos', 'Tres']
+    assert [nombre for lote in resumen for nombre in lote['nombres_omitidos']] == ['Uno', 'Dos']
+    assert len(gestion.leer_todos_productos()) == 3
+
+def test_leer_productos(gestion):
+    gestion.crear_productos([leche('Leche'), televisor('Televisor')])
+    encontrados, faltantes = gestion.leer_productos(['Leche', 'Nada', 'Televisor'])
+    assert set(encontrados) == {'Leche', 'Televisor'}
+    assert faltantes == ['Nada']
+
+def test_leer_productos_con_distintas_grafias(gestion):
+    gestion.crear_producto(leche())
+    encontrados, faltantes = gestion.leer_productos(['LECHE', 'leche', 'Leche', 'NADA', 'nada'])
+    assert set(encontrados) == {'LECHE', 'leche', 'Leche'}
+    assert all(producto['Nombre'] == 'Leche' for producto in encontrados.values())
+    assert faltantes == ['NADA', 'nada']
+
+def test_iterar_productos_por_paginas(gestion):
+    gestion.crear_productos([leche(f'Producto{i:03d}') for i in range(23)])
+    nombres = [producto['Nombre'] for producto in gestion.iterar_productos(tamano_pagina=5)]
+    assert nombres == [f'Producto{i:03d}' for i in range(23)]
+
+# --- Ajustes en el servidor ---
+
+def test_ajustar_stock(gestion):
+    gestion.crear_producto(leche(stock=10))
+    assert gestion.ajustar_stock_producto('Leche', -3) == 7
+    assert gestion.ajustar_stock_producto('Leche', 0) == 7
+    assert gestion.ajustar_stock_producto('Leche', -8) is None
+    assert gestion.ajustar_stock_producto('Leche', -7) == 0
+    assert gestion.ajustar_stock_producto('Nada', 1) is None
+
+def test_ajustar_precio(gestion):
+    gestion.crear_producto(leche())
+    assert gestion.ajustar_precio_producto('Leche', 10) == pytest.approx(110)
+    assert gestion.ajustar_precio_producto('Leche', 0) == pytest.approx(110)
+    assert gestion.ajustar_precio_producto('Leche', -100) is None
+    assert gestion.ajustar_precio_producto('Nada', 10) is None
+
+def test_ajustar_stock_productos_todo_o_nada(gestion):
+    gestion.crear_productos([leche(stock=10), televisor(stock=3)])
+    assert gestion.ajustar_stock_productos({'Leche': -1, 'Televisor': 0}) == {'Leche': 9, 'Televisor': 3}
+    assert gestion.ajustar_stock_productos({'Leche': -1, 'Televisor': -4}) is None
+    assert gestion.leer_producto('Leche')['Stock'] == 9
+
+# --- Transacciones ---
+
+def test_transaccion_aplica_todo(gestion):
+    gestion.crear_producto(leche(stock=10))
+    with gestion.transaction() as tx:
+        tx.crear(televisor())
+        tx.actualizar_precio('Leche', 120)
+        tx.ajustar_stock('Leche', -2)
+        tx.eliminar('Televisor')
+    assert tx.resumen == {'creados': 1, 'actualizados': 2, 'eliminados': 1}
+    producto = gestion.leer_producto('Leche')
+    assert (producto['Precio'], producto['Stock']) == (120, 8)
+    assert gestion.leer_producto('Televisor') is None
+
+@pytest.mark.parametrize('operacion', [
+    lambda tx: tx.actualizar_stock('Nada', 5),
+    lambda tx: tx.actualizar_precio('Nada', 5),
+    lambda tx: tx.ajustar_stock('Leche', -100),
+    lambda tx: tx.crear(leche()),
+    lambda tx: (tx.eliminar('Leche'), tx.eliminar('Nada')),
+], ids=['stock_inexistente', 'precio_inexistente', 'stock_insuficiente', 'duplicado', 'eliminar_inexistente'])
+def test_transaccion_no_aplica_nada_si_falla(gestion, operacion):
+    gestion.crear_producto(leche(stock=10))
+    with pytest.raises(Exception):
+        with gestion.transaction() as tx:
+            tx.crear(televisor())
+            tx.actualizar_stock('Leche', 1)
+            operacion(tx)
+    assert gestion.leer_producto('Televisor') is None
+    assert gestion.leer_producto('Leche')['Stock'] == 10
+
+def test_transaccion_descartada_por_excepcion(gestion):
+    with pytest.raises(RuntimeError):
+        with gestion.transaction() as tx:
+            tx.crear(leche())
+            raise RuntimeError
+    assert gestion.leer_producto('Leche') is None
+
+# --- Registro de cambios ---
+
+def test_registro_de_cambios(gestion):
+    inicial = gestion.version_cambios()
+    gestion.crear_producto(leche())
+    gestion.crear_producto(televisor())
+    gestion.actualizar_stock_producto('Leche', 4)
+    gestion.eliminar_producto('Televisor')
+
+    cambios = list(gestion.cambios_desde(inicial, tamano_pagina=2))
+    assert [(cambio['operacion'], cambio['Nombre']) for cambio in cambios] == [
+        ('alta', 'Leche'), ('alta', 'Televisor'), ('modificacion', 'Leche'), ('baja', 'Televisor'),
+    ]
+    assert [cambio['version'] for cambio in cambios] == sorted(cambio['version'] for cambio in cambios)
+    assert cambios[2]['producto']['Stock'] == 4
+    assert cambios[3]['producto'] is None
+    assert gestion.version_cambios() == cambios[-1]['version']
+
+    assert gestion.purgar_cambios(cambios[1]['version']) >= 2
+    assert [cambio['version'] for cambio in gestion.cambios_desde(inicial)] == [c['version'] for c in cambios[2:]]
+
+# --- Consultas de analisis ---
+
+def test_analisis_por_vencer_y_antiguedad(gestion):
+    analisis = pytest.importorskip('analisis')
+    hoy = date(2026, 6, 1)
+    gestion.crear_productos([
+        leche('Pronto', vencimiento=hoy + timedelta(days=3)),
+        leche('Lejos', vencimiento=hoy + timedelta(days=30)),
+        ProductoElectronico('Nuevo', 10, 1, 'China', '2025-12-31'),
+        ProductoElectronico('Viejo', 10, 1, 'China', '2020-06-01'),
+    ])
+    consultas = analisis.AnalisisSQL(gestion)
+    assert [fila['Nombre'] for fila in consultas.por_vencer(7, hoy)] == ['Pronto']
+    assert [(fila['anios'], fila['productos']) for fila in consultas.electronicos_por_antiguedad(hoy)] == [(0, 1), (6, 1)]
+
+def test_seguir_cambios_recoge_versiones_confirmadas_tarde(gestion):
+    gestion.crear_producto(leche('Uno'))
+    gestion.crear_producto(leche('Dos'))
+    gestion.crear_producto(leche('Tres'))
+    connection = gestion.connect()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT version, producto_id, Nombre, operacion FROM productos_cambios WHERE Nombre = 'Dos'")
+            demorado = cursor.fetchone()
+            # la version de 'Dos' todavia no esta confirmada cuando el consumidor lee
+            cursor.execute('DELETE FROM productos_cambios WHERE version = %s', (demorado[0],))
+        connection.commit()
+
+        seguimiento = gestion.seguir_cambios(0, margen=10)
+        assert [cambio['Nombre'] for cambio in seguimiento.nuevos()] == ['Uno', 'Tres']
+
+        with connection.cursor() as cursor:
+            cursor.execute('INSERT INTO productos_cambios (version, producto_id, Nombre, operacion) VALUES (%s, %s, %s, %s)',
+                           demorado)
+        connection.commit()
+    finally:
+        gestion.cerrar_conexion(connection)
+
+    assert [cambio['Nombre'] for cambio in seguimiento.nuevos()] == ['Dos']
+    assert list(seguimiento.nuevos()) == []
+    gestion.eliminar_producto('Uno')
+    assert [(cambio['operacion'], cambio['Nombre']) for cambio in seguimiento.nuevos()] == [('baja', 'Uno')]
+
+# --- Copia en memoria de leer_todos_productos ---
+
+def test_copia_de_leer_todos_productos_no_se_comparte(gestion):
+    gestion.snapshot_ttl = 60
+    gestion.crear_producto(leche(stock=10))
+    gestion.leer_todos_productos()[0]['Stock'] = -999
+    gestion.leer_todos_productos()[0]['Stock'] = -999
+    assert gestion.leer_todos_productos()[0]['Stock'] == 10
+
+def test_copia_de_leer_todos_productos_ve_escrituras_propias_y_tardias(gestion):
+    gestion.snapshot_ttl = 60
+    gestion.crear_producto(leche('Uno', stock=10))
+    assert gestion.leer_todos_productos()[0]['Stock'] == 10
+    gestion.actualizar_stock_producto('Uno', 3)
+    assert gestion.leer_todos_productos()[0]['Stock'] == 3
+
+    # otro proceso confirma tarde una escritura: su version es menor que la maxima ya leida
+    connection = gestion.backend.connect()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE productos SET Stock = 7 WHERE Nombre = 'Uno'")
+            cursor.execute('SELECT MAX(version) FROM productos_cambios')
+            (ultima,) = cursor.fetchone()
+            cursor.execute('UPDATE productos_cambios SET version = 0 WHERE version = %s', (ultima,))
+        connection.commit()
+    finally:
+        gestion.cerrar_conexion(connection)
+    assert gestion.leer_todos_productos()[0]['Stock'] == 7
+
+# --- Replicas de lectura (SQLite) ---
+
+def test_replica_sqlite_inexistente_lee_del_primario(tmp_path):
+    replica = tmp_path / 'replica.db'
+    gestion = GestionProductos(backend=crear_backend('sqlite', ruta=str(tmp_path / 'productos.db')),
+                               replicas=[str(replica)])
+    gestion.instrumentacion = None
+    gestion.cache.tamano_maximo = 0
+    gestion.leer_escrituras_propias = False
+    assert gestion.crear_tablas()
+    gestion.crear_producto(leche())
+    assert gestion.leer_producto('Leche')['Stock'] == 10
+    # la replica se abre en solo lectura: no se crea una base vacia en su lugar
+    assert not replica.exists()
+
+def test_replica_sqlite_es_solo_lectura(tmp_path):
+    primario = crear_backend('sqlite', ruta=str(tmp_path / 'productos.db'))
+    gestion = GestionProductos(backend=primario, replicas=[])
+    gestion.instrumentacion = None
+    assert gestion.crear_tablas()
+    gestion.crear_producto(leche())
+
+    (replica,) = crear_replicas('sqlite', [str(tmp_path / 'productos.db')])
+    connection = replica.connect()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT COUNT(*) FROM productos')
+        assert cursor.fetchone()[0] == 1
+        with pytest.raises(replica.Error):
+            cursor.execute("DELETE FROM productos")
+
+# --- Instrumentacion ---
+
+def test_instrumentacion_registra_fases_y_filas(gestion):
+    from instrumentacion import Instrumentacion
+    gestion.instrumentacion = Instrumentacion()
+    gestion.crear_productos([leche(f'Leche {i}') for i in range(3)])
+    for _ in range(4):
+        gestion.leer_producto('Leche 1')
+    gestion.leer_todos_productos()
+
+    registro = gestion.instrumentacion.registro
+    fases = registro.resumen()['leer_producto']
+    assert fases['total']['cantidad'] == fases['execute']['cantidad'] == 4
+    filas = registro.resumen_filas()
+    assert (filas['leer_producto']['cantidad'], filas['leer_producto']['p50']) == (4, 1)
+    assert filas['leer_todos_productos']['total'] >= 3
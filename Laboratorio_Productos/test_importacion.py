@@ -0,0 +1,109 @@
+""" Pruebas de la lectura incremental de archivos de importacion.
+
+_leer_json se prueba con bloques de pocos caracteres, para que numeros, textos y separadores
+queden cortados entre un bloque y el siguiente. La importacion completa corre contra SQLite.
+
+    python -m pytest -q
+ """
+
+import io
+import json
+
+import pytest
+
+from almacenamiento import crear_backend
+from clases import GestionProductos
+from importacion import RegistroInvalido, _leer_json, importar_productos, leer_registros
+
+def leer(texto, tamano_bloque):
+    return list(_leer_json(io.StringIO(texto), tamano_bloque=tamano_bloque))
+
+@pytest.mark.parametrize('tamano_bloque', [1, 2, 3, 7, 1 << 16])
+@pytest.mark.parametrize('texto', [
+    '[123456, 7]',
+    '[1.5e10,-20,true,null,"abc\\"def"]',
+    '  [ {"nombre": "Leche", "stock": 10} ,\n {"nombre": "Pan", "stock": 2} ]  \n',
+    '{"Leche": {"precio": 100}, "Pan": {"precio": 2, "nombre": "Pan integral"}}',
+    '[]',
+    '{ }',
+    '[[1, 2], {"a": [3]}]',
+])
+def test_leer_json_valido(texto, tamano_bloque):
+    esperado = json.loads(texto)
+    if isinstance(esperado, dict):
+        esperado = [{'nombre': clave, **valor} for clave, valor in esperado.items()]
+    assert leer(texto, tamano_bloque) == esperado
+
+def test_leer_json_vacio():
+    assert leer('', 3) == []
+    assert leer('  \n', 3) == []
+
+@pytest.mark.parametrize('tamano_bloque', [1, 3, 1 << 16])
+@pytest.mark.parametrize('texto', [
+    '[1 2]',
+    '[{"a": 1} {"a": 2}]',
+    '[{"a": 1},,,{"a": 2}]',
+    '[,1]',
+    '[1,]',
+    '{"a" 1}',
+    '{"a":: 1}',
+    '{1: {"a": 1}}',
+    '[1, 2] [3]',
+    '[1, 2] x',
+    '[1, 2',
+    '[1, 2,',
+    '{"a": 1',
+    '"texto"',
+    '[12 34]',
+])
+def test_leer_json_invalido(texto, tamano_bloque):
+    with pytest.raises(ValueError):
+        leer(texto, tamano_bloque)
+
+def test_leer_registros_corta_en_json_invalido(tmp_path):
+    ruta = tmp_path / 'productos.json'
+    ruta.write_text('[{"nombre": "Leche"} {"nombre": "Pan"}]', encoding='utf-8')
+    registros = list(leer_registros(str(ruta)))
+    assert registros[0] == {'nombre': 'Leche'}
+    assert len(registros) == 2 and isinstance(registros[1], RegistroInvalido)
+
+def test_leer_registros_ndjson_sigue_despues_de_linea_invalida(tmp_path):
+    ruta = tmp_path / 'productos.ndjson'
+    ruta.write_text('{"nombre": "Leche"}\n{"nombre": \n\n{"nombre": "Pan"}\n', encoding='utf-8')
+    registros = list(leer_registros(str(ruta)))
+    assert registros[0] == {'nombre': 'Leche'} and registros[2] == {'nombre': 'Pan'}
+    assert isinstance(registros[1], RegistroInvalido)
+
+def test_leer_registros_csv_omite_vacios(tmp_path):
+    ruta = tmp_path / 'productos.csv'
+    ruta.write_text('nombre,precio,stock,origen,fecha_vencimiento\nLeche,100,10,Arg,\n', encoding='utf-8')
+    assert list(leer_registros(str(ruta))) == [{'nombre': 'Leche', 'precio': '100', 'stock': '10', 'origen': 'Arg'}]
+
+# --- Importacion contra SQLite ---
+
+@pytest.fixture
+def gestion(tmp_path):
+    gestion = GestionProductos(backend=crear_backend('sqlite', ruta=str(tmp_path / 'productos.db')), replicas=[])
+    gestion.instrumentacion = None
+    gestion.cache.tamano_maximo = 0
+    assert gestion.crear_tablas()
+    return gestion
+
+def test_importar_json(gestion, tmp_path):
+    ruta = tmp_path / 'productos.json'
+    ruta.write_text(json.dumps({
+        'Leche': {'precio': 100, 'stock': 10, 'origen': 'Arg', 'fecha_vencimiento': '01-01-2030'},
+        'Televisor': {'precio': 5000, 'stock': 3, 'origen': 'China', 'fecha_fabricacion': '2020-06-15'},
+        'Roto': {'precio': 'caro', 'stock': 1, 'origen': 'Arg'},
+    }), encoding='utf-8')
+    resultado = importar_productos(gestion, str(ruta), tamano_lote=2)
+    assert resultado['completa'] and resultado['insertados'] == 2 and len(resultado['invalidos']) == 1
+    assert gestion.leer_producto('Leche')['fecha_vencimiento'] is not None
+    assert gestion.leer_producto('Televisor')['fecha_fabricacion'] is not None
+
+def test_importar_json_invalido_informa_el_corte(gestion, tmp_path):
+    ruta = tmp_path / 'productos.json'
+    ruta.write_text('[{"nombre": "Leche", "precio": 100, "stock": 10, "origen": "Arg"},, {"nombre": "Pan"}]',
+                    encoding='utf-8')
+    resultado = importar_productos(gestion, str(ruta))
+    assert resultado['insertados'] == 1 and len(resultado['invalidos']) == 1